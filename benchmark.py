@@ -0,0 +1,440 @@
+"""
+Benchmarks da normalização de transcrições.
+
+Uso:
+    python benchmark.py pipeline --lines 100000
+    python benchmark.py encoding-units --lines 100000
+    python benchmark.py startup --repeat 10
+    python benchmark.py tokens --lines 2000
+    python benchmark.py special --lines 100000
+    python benchmark.py money --lines 100000
+"""
+import argparse
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from convert_special_cases import normalize_monetary_value, normalize_special_characters, transcribe_ordinal
+from normalizar_coluna import convert_numbers, correct_encoding_issues, normalize_units, treat_specific_cases
+from normalizar_numeros import EXTENSO, escrever
+from token_alignment import clear_caches, normalize_span, normalize_tokens, source_spans
+
+
+WORDS = ['o', 'a', 'de', 'que', 'não', 'uma', 'para', 'com', 'mais', 'muito', 'também', 'então', 'porque',
+         'você', 'gente', 'assim', 'coisa', 'aqui', 'episódio', 'podcast', 'obrigado', 'pessoal', 'hoje']
+
+MOJIBAKE = ['Ã©', 'Ã¡', 'Ãª', 'Ã£', 'Ã³', 'Ã', 'Ã§', 'Ãº', 'Ãµ', 'Ã¤', 'Ã¶', 'Ã¼', 'Ã¢', 'Ã®', 'Ã´', 'Â', 'â',
+            'ÃÂ©', 'nÃ£o', 'tambÃ©m', 'Ã©poca']
+
+UNITS = ['km', 'ml', 'kg', 'cm', 'mm', 'ºC', 'km/h', 'm/s', '5km', '10 km', 'km/hora', 'cm/s', 'mm/s', 'kmh',
+         '30ºC', 'm/s²', '(km)', 'kg.', 'mlx']
+
+
+def legacy_correct_encoding_issues(text):
+    # Implementação anterior, com uma chamada de str.replace por regra
+    text = text.replace('Ã©', 'é').replace('Ã¡', 'á').replace('Ãª', 'ê')
+    text = text.replace('Ã£', 'ã').replace('Ã³', 'ó').replace('Ã', 'à')
+    text = text.replace('Ã§', 'ç').replace('Ãº', 'ú').replace('Ãµ', 'õ')
+    text = text.replace('Ã¤', 'ä').replace('Ã¶', 'ö').replace('Ã¼', 'ü')
+    text = text.replace('Ã¢', 'â').replace('Ã®', 'î').replace('Ã´', 'ô')
+    text = text.replace('Â', '').replace('â', 'a')
+    return text
+
+
+def legacy_normalize_units(text):
+    # Implementação anterior, com um re.sub por unidade
+    units_map = {
+        r'\bkm\b': 'quilômetros',
+        r'\bml\b': 'mililitros',
+        r'\bkg\b': 'quilogramas',
+        r'\bcm\b': 'centímetros',
+        r'\bmm\b': 'milímetros',
+        r'\bºC\b': 'graus Celsius',
+        r'\bkm/h\b': 'quilômetros por hora',
+        r'\bm/s\b': 'metros por segundo'
+    }
+
+    for unit_pattern, full_unit in units_map.items():
+        text = re.sub(unit_pattern, full_unit, text)
+
+    return text
+
+
+def legacy_normalize_number(number_str):
+    # Implementação anterior da leitura de valores monetários
+    parts = number_str.replace('.', ',').split(',')
+
+    if len(parts) == 1:
+        return EXTENSO.escrever(int(parts[0]))
+    elif len(parts) == 2:
+        decimal_part = parts[1] if parts[1] else '0'
+        return f"{EXTENSO.escrever(int(parts[0]))} vírgula {EXTENSO.escrever(int(decimal_part))}"
+    else:
+        raise ValueError(f"Unexpected format for number: {number_str}")
+
+
+def legacy_normalize_monetary_value(text):
+    # Implementação anterior, com uma varredura por moeda
+    text = re.sub(r'R\$\s*(\d+[,\.]?\d*)', lambda m: f"{legacy_normalize_number(m.group(1))} reais", text)
+    text = re.sub(r'US\$\s*(\d+[,\.]?\d*)', lambda m: f"{legacy_normalize_number(m.group(1))} dólares", text)
+    return text
+
+
+def legacy_normalize_special_characters(text):
+    # Implementação anterior, com um re.sub por regra e as unidades ao
+    # quadrado recompiladas a cada chamada. Os valores monetários usam a
+    # implementação atual, para que a comparação meça apenas as varreduras
+    text = re.sub(r'(?<=\S)&(?=\S)', ' e ', text)
+    text = re.sub(r'(?<=\s)&(?=\s)', 'e', text)
+    text = re.sub(r'(?<=\S)\+(?=\S)', ' mais ', text)
+    text = re.sub(r'(?<=\s)\+(?=\s)', 'mais', text)
+    text = normalize_monetary_value(text)
+    text = re.sub(r'\b(\w+?)²\b', lambda m: f"{m.group(1)} ao quadrado", text)
+    text = re.sub(r'(\d+)²', lambda m: f"{m.group(1)} ao quadrado", text)
+    text = re.sub(r'§\s*(\d+)', r'parágrafo \1', text)
+    text = re.sub(r'(?<=\d)π', ' pi', text)
+    text = re.sub(r'(?<=\s)π(?=\s)', 'pi', text)
+    text = re.sub(r'(\d+[\d,\.]*)\s*€', r'\1 euros', text)
+    text = re.sub(r'(\d+)(º|ª)', lambda match: transcribe_ordinal(int(match.group(1)), match.group(2)), text)
+
+    units_dict = {
+        'm²': 'metro ao quadrado', 'km²': 'quilômetro ao quadrado', 'g²': 'grama ao quadrado',
+        'kg²': 'quilograma ao quadrado', 'l²': 'litro ao quadrado', 'cm²': 'centímetro ao quadrado',
+        'mm²': 'milímetro ao quadrado', 'ml²': 'mililitro ao quadrado', 't²': 'tonelada ao quadrado'
+    }
+    text = re.compile(r'(\d+(\.\d+)?)\s*²').sub(lambda m: f"{m.group(1)} ao quadrado", text)
+    text = re.compile(r'\b(\w+)²\b').sub(lambda m: units_dict.get(m.group(0), m.group(0)), text)
+    return text
+
+
+def mixed_corpus(lines, seed):
+    """
+    Gera linhas misturando palavras comuns, mojibake e unidades, coladas ou
+    separadas por espaço, para exercitar as fronteiras das regras.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(lines):
+        tokens = []
+        for _ in range(rng.randint(3, 30)):
+            roll = rng.random()
+            if roll < 0.9:
+                token = rng.choice(WORDS)
+            elif roll < 0.95:
+                token = rng.choice(MOJIBAKE)
+            else:
+                token = rng.choice(UNITS)
+            if tokens and rng.random() < 0.15:
+                tokens[-1] += token
+            else:
+                tokens.append(token)
+        corpus.append(' '.join(tokens))
+    return corpus
+
+
+# Frases típicas de transcrições, com lacunas preenchidas pelo gerador
+TEMPLATES = [
+    'olá pessoal bem-vindos a mais um episódio do podcast',
+    'hoje a gente vai conversar sobre {topic} com {n} convidados',
+    'o ingresso custa R$ {money} e a meia entrada sai por R$ {money}',
+    'ele investiu US$ {money} na empresa em {year}',
+    'o time terminou em {n}º lugar pela {n}ª vez seguida',
+    'a gente gravou às {hour}h{minute} e terminou às {hour}:{minute}',
+    'corri {n}km ontem e hoje mais {n} km',
+    'a temperatura chegou a {n}ºC e a umidade ficou em {n}%',
+    'comprei {n}kg de arroz e {n} ml de azeite',
+    'a tela tem {n}x{n} pixels e o chip tem {n}bits',
+    'o terreno tem {n}m² segundo o § {n} do contrato',
+    'isso aconteceu em {year} quando eu tinha {n} anos',
+    'o carro passou dos {n}km/h na rodovia',
+    'foram {thousands} pessoas no show de {year}',
+    'nÃ£o sei se vocÃª lembra daquela Ã©poca',
+    'muito obrigado e até o próximo episódio',
+    'o placar foi {n} a {n} com gol aos {n} minutos',
+    'ele ficou em {n}st lugar no campeonato americano',
+]
+
+TOPICS = ['tecnologia', 'futebol', 'economia', 'música', 'política', 'saúde', 'educação']
+
+
+def generate_transcripts(lines, seed):
+    """
+    Gera transcrições sintéticas em português, com números, valores
+    monetários, ordinais, horários, unidades e mojibake, de forma
+    reprodutível a partir da semente.
+    """
+    rng = random.Random(seed)
+
+    def fill(template):
+        return re.sub(r'\{(\w+)\}', lambda m: fillers[m.group(1)](), template)
+
+    fillers = {
+        'n': lambda: str(rng.choice([rng.randint(1, 10), rng.randint(1, 100), rng.randint(1, 1000)])),
+        'money': lambda: rng.choice([str(rng.randint(1, 500)), f'{rng.randint(1, 99)},{rng.randint(0, 99):02d}']),
+        'year': lambda: str(rng.randint(1950, 2030)),
+        'hour': lambda: str(rng.randint(0, 23)),
+        'minute': lambda: f'{rng.randint(0, 59):02d}',
+        'thousands': lambda: f'{rng.randint(1, 99)}.{rng.randint(0, 999):03d}',
+        'topic': lambda: rng.choice(TOPICS),
+    }
+
+    return [' '.join(fill(rng.choice(TEMPLATES)) for _ in range(rng.randint(1, 4))) for _ in range(lines)]
+
+
+# Trechos com moedas e símbolos, para o benchmark de normalize_special_characters
+SYMBOL_TEMPLATES = [
+    'custa R$ {money} ou US$ {money} lá fora',
+    'o ingresso sai por {n}€ e o combo por {money} €',
+    'conforme o § {n} e o §{n} do art. {n}º',
+    'a área é {n}m² e o lote tem {n} km²',
+    'a & b fizeram rock&roll com {n}+{n} músicas',
+    'ficou em {n}º lugar pela {n}ª vez',
+    'a fórmula é {n}π r² mais π',
+    'o preço subiu + {n}% e caiu {n}%',
+]
+
+
+# Trechos de transcrições financeiras, com valores no formato brasileiro
+MONEY_TEMPLATES = [
+    'o faturamento foi de R$ {thousands},{cents} no trimestre',
+    'a ação fechou a R$ {n},{cents} e o dólar a R$ {n},{cents}',
+    'ele recebeu US$ {n} de bônus e mais R$ {n}',
+    'o rombo chegou a R$ {n} bilhões e a dívida a R$ {n},{cent} milhão',
+    'custa R$ {n} ou {n}x de R$ {n},{cents}',
+    'o lucro líquido somou R$ {millions} em {n}',
+]
+
+
+def money_corpus(lines, seed):
+    """
+    Gera linhas densas em valores monetários, como em transcrições de
+    programas de economia.
+    """
+    rng = random.Random(seed)
+    fillers = {
+        'n': lambda: str(rng.randint(1, 999)),
+        'cents': lambda: f'{rng.randint(0, 99):02d}',
+        'cent': lambda: str(rng.randint(1, 9)),
+        'thousands': lambda: f'{rng.randint(1, 999)}.{rng.randint(0, 999):03d}',
+        'millions': lambda: f'{rng.randint(1, 99)}.{rng.randint(0, 999):03d}.{rng.randint(0, 999):03d}',
+    }
+    return [' '.join(re.sub(r'\{(\w+)\}', lambda m: fillers[m.group(1)](), rng.choice(MONEY_TEMPLATES))
+                     for _ in range(rng.randint(1, 3))) for _ in range(lines)]
+
+
+def symbol_corpus(lines, seed):
+    """
+    Gera linhas densas em moedas e símbolos, misturadas a palavras comuns.
+    """
+    rng = random.Random(seed)
+    fillers = {
+        'n': lambda: str(rng.randint(1, 500)),
+        'money': lambda: rng.choice([str(rng.randint(1, 5000)), f'{rng.randint(1, 999)},{rng.randint(0, 99):02d}']),
+    }
+    corpus = []
+    for _ in range(lines):
+        parts = [rng.choice(WORDS) for _ in range(rng.randint(2, 10))]
+        parts.insert(rng.randint(0, len(parts)), re.sub(r'\{(\w+)\}', lambda m: fillers[m.group(1)](),
+                                                         rng.choice(SYMBOL_TEMPLATES)))
+        corpus.append(' '.join(parts))
+    return corpus
+
+
+def time_function(function, corpus, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            function(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(name, legacy, current, corpus, repeat):
+    """
+    Confere que as duas implementações produzem a mesma saída e mede ambas.
+    """
+    mismatches = [text for text in corpus if legacy(text) != current(text)]
+    if mismatches:
+        raise AssertionError(f"{name}: {len(mismatches)} linhas divergentes, ex.: {mismatches[0]!r}")
+
+    legacy_time = time_function(legacy, corpus, repeat)
+    current_time = time_function(current, corpus, repeat)
+    print(f"{name}: saída idêntica em {len(corpus)} linhas | "
+          f"anterior {len(corpus) / legacy_time:,.0f} linhas/s | "
+          f"atual {len(corpus) / current_time:,.0f} linhas/s | "
+          f"ganho {legacy_time / current_time:.2f}x")
+
+
+def bench_pipeline(args):
+    """
+    Mede a vazão da normalização completa, o tempo de cada etapa e o pico
+    de memória sobre transcrições sintéticas.
+    """
+    corpus = generate_transcripts(args.lines, args.seed)
+    special = [normalize_special_characters(text) for text in corpus]
+    numbers = [convert_numbers(text) for text in special]
+
+    # Cada etapa é medida isoladamente, sobre a saída da etapa anterior
+    stages = [
+        ('correct_encoding_issues', correct_encoding_issues, corpus),
+        ('normalize_special_characters', normalize_special_characters, corpus),
+        ('conversão de números', convert_numbers, special),
+        ('normalize_units', normalize_units, numbers),
+        ('treat_specific_cases', treat_specific_cases, corpus),
+    ]
+
+    print(f"{len(corpus)} linhas, {sum(map(len, corpus)):,} caracteres")
+    for name, function, stage_corpus in stages:
+        elapsed = time_function(function, stage_corpus, args.repeat)
+        print(f"{name:<30} {elapsed * 1000:10.1f} ms {len(stage_corpus) / elapsed:14,.0f} linhas/s")
+
+    rng = random.Random(args.seed)
+    numbers = [rng.randint(0, 10 ** rng.randint(1, 12)) for _ in range(args.lines)]
+    escrever.cache_clear()
+    start = time.perf_counter()
+    for number in numbers:
+        EXTENSO.escrever(number)
+    cold = time.perf_counter() - start
+    warm = time_function(EXTENSO.escrever, numbers, args.repeat)
+    print(f"{'Extenso.escrever (frio)':<30} {cold * 1000:10.1f} ms {len(numbers) / cold:14,.0f} números/s")
+    print(f"{'Extenso.escrever (cache)':<30} {warm * 1000:10.1f} ms {len(numbers) / warm:14,.0f} números/s")
+
+    tracemalloc.start()
+    normalized = [treat_specific_cases(text) for text in corpus]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Pico de memória da normalização: {peak / 2 ** 20:.1f} MiB para {len(normalized)} linhas")
+
+
+def bench_special(args):
+    corpus = symbol_corpus(args.lines, args.seed)
+    compare('normalize_special_characters (símbolos)', legacy_normalize_special_characters,
+            normalize_special_characters, corpus, args.repeat)
+    corpus = generate_transcripts(args.lines, args.seed)
+    compare('normalize_special_characters (transcrições)', legacy_normalize_special_characters,
+            normalize_special_characters, corpus, args.repeat)
+
+
+def bench_money(args):
+    """
+    Mede a leitura de valores monetários em transcrições financeiras. As
+    saídas diferem da implementação anterior, que não reconhecia o ponto de
+    milhar nem os centavos; o benchmark conta as linhas com algum valor mal
+    lido (símbolo de moeda restante, centavos ou escala depois da moeda).
+    """
+    corpus = money_corpus(args.lines, args.seed)
+    leftover = re.compile(r'\$|(?:real|reais|dólar|dólares)(?:[,.]\d|\s+(?:mil|milh|bilh|trilh))')
+    for name, function in (('anterior', legacy_normalize_monetary_value), ('atual', normalize_monetary_value)):
+        elapsed = time_function(function, corpus, args.repeat)
+        misread = sum(bool(leftover.search(function(text))) for text in corpus)
+        print(f"{name:<10} {elapsed * 1000:10.1f} ms {len(corpus) / elapsed:12,.0f} linhas/s | "
+              f"{misread} linhas com valores mal lidos")
+    print(f"exemplo: {corpus[0]}\n      -> {normalize_monetary_value(corpus[0])}")
+
+
+def bench_encoding_units(args):
+    corpus = mixed_corpus(args.lines, args.seed)
+    compare('correct_encoding_issues', legacy_correct_encoding_issues, correct_encoding_issues, corpus, args.repeat)
+    compare('normalize_units', legacy_normalize_units, normalize_units, corpus, args.repeat)
+
+
+def rebuild_from_spans(text):
+    """
+    Remonta o texto normalizado a partir dos trechos de normalize_tokens,
+    mantendo os espaços originais entre eles.
+    """
+    parts = []
+    last = 0
+    for start, end in source_spans(text):
+        parts.append(text[last:start])
+        parts.append(normalize_span(text[start - 1:start], text[start:end], text[end:end + 1]))
+        last = end
+    parts.append(text[last:])
+    return ''.join(parts)
+
+
+def bench_tokens(args):
+    """
+    Compara a normalização por palavra, com offsets, à normalização do texto
+    inteiro, sobre textos longos (episódios inteiros).
+    """
+    transcripts = generate_transcripts(args.lines * 50, args.seed)
+    corpus = [' '.join(transcripts[i:i + 50]) for i in range(0, len(transcripts), 50)]
+
+    mismatches = [text for text in corpus if rebuild_from_spans(text) != treat_specific_cases(text)]
+    if mismatches:
+        raise AssertionError(f"tokens: {len(mismatches)} textos divergentes, ex.: {mismatches[0][:200]!r}")
+
+    print(f"{len(corpus)} textos, {sum(map(len, corpus)) / len(corpus):,.0f} caracteres em média")
+    clear_caches()
+    start = time.perf_counter()
+    for text in corpus:
+        normalize_tokens(text)
+    cold = time.perf_counter() - start
+    whole = time_function(treat_specific_cases, corpus, args.repeat)
+    tokens = time_function(normalize_tokens, corpus, args.repeat)
+    print(f"{'treat_specific_cases':<30} {whole * 1000:10.1f} ms {len(corpus) / whole:10,.0f} textos/s")
+    print(f"{'normalize_tokens (frio)':<30} {cold * 1000:10.1f} ms {len(corpus) / cold:10,.0f} textos/s")
+    print(f"{'normalize_tokens (cache)':<30} {tokens * 1000:10.1f} ms {len(corpus) / tokens:10,.0f} textos/s "
+          f"| {whole / tokens:.2f}x a velocidade do texto inteiro")
+
+
+# Comandos medidos no benchmark de inicialização, cada um em um processo novo
+STARTUP_COMMANDS = [
+    ('python vazio', 'pass'),
+    ('import normalizar_coluna', 'import normalizar_coluna'),
+    ('primeira normalização', 'import normalizar_coluna as n; n.treat_specific_cases("custa R$ 25 às 2h15")'),
+    ('primeiro ordinal em inglês', 'import normalizar_coluna as n; n.treat_specific_cases("ficou em 21st")'),
+]
+
+
+def bench_startup(args):
+    """
+    Mede o tempo de inicialização de um processo novo, que é o custo pago
+    por execuções curtas e por cada worker.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for name, code in STARTUP_COMMANDS:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], cwd=base_dir, check=True)
+            timings.append(time.perf_counter() - start)
+        print(f"{name:<30} mínimo {min(timings) * 1000:8.1f} ms | média {sum(timings) / len(timings) * 1000:8.1f} ms")
+
+
+BENCHMARKS = {
+    'pipeline': bench_pipeline,
+    'encoding-units': bench_encoding_units,
+    'startup': bench_startup,
+    'tokens': bench_tokens,
+    'special': bench_special,
+    'money': bench_money,
+}
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmarks for the transcription normalization pipeline')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS),
+                      help='Benchmark to run')
+    parser.add_argument('--lines', '-n', type=int, default=50000,
+                      help='Number of synthetic lines to generate')
+    parser.add_argument('--seed', type=int, default=0,
+                      help='Seed for the synthetic corpus')
+    parser.add_argument('--repeat', type=int, default=3,
+                      help='Number of timing repetitions (best time is reported)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
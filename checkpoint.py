@@ -0,0 +1,98 @@
+"""
+Checkpoints das execuções em blocos, para retomá-las com --resume.
+
+Depois que cada bloco é gravado na saída, um manifesto JSON ao lado do
+arquivo de saída registra quantos blocos já foram concluídos, o tamanho da
+saída até ali e os contadores da execução. Ao retomar, a saída é truncada no
+tamanho registrado (descartando um bloco gravado pela metade), os blocos
+concluídos são pulados e a execução continua a partir do bloco seguinte.
+
+Apenas saídas CSV e JSONL podem ser retomadas: Parquet e Arrow não permitem
+acrescentar blocos a um arquivo que já foi fechado.
+"""
+import json
+import os
+from typing import Dict, List, Optional
+
+
+# Formatos de saída em que a gravação pode continuar de onde parou
+RESUMABLE_FORMATS = ('csv', 'jsonl')
+
+
+def manifest_path(output: str) -> str:
+    return output + '.checkpoint.json'
+
+
+class Checkpoint:
+    """
+    Manifesto de progresso de uma execução.
+
+    settings guarda os parâmetros que determinam a divisão em blocos e o
+    conteúdo da saída; uma execução só pode ser retomada com os mesmos
+    parâmetros. A versão das regras fica à parte: se mudou (por exemplo,
+    depois de corrigir a regra que derrubou a execução), os blocos já
+    gravados mantêm o resultado das regras anteriores.
+    """
+
+    def __init__(self, path: str, settings: Dict, version: str):
+        self.path = path
+        self.settings = settings
+        self.version = version
+        self.chunks = 0
+        self.output_size = 0
+        self.quarantine_size = 0
+        self.counters: Dict[str, int] = {}
+        self.stats: Optional[Dict] = None
+
+    @classmethod
+    def load(cls, path: str) -> 'Checkpoint':
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+        checkpoint = cls(path, data['settings'], data['version'])
+        checkpoint.chunks = data['chunks']
+        checkpoint.output_size = data['output_size']
+        checkpoint.quarantine_size = data['quarantine_size']
+        checkpoint.counters = data['counters']
+        checkpoint.stats = data['stats']
+        return checkpoint
+
+    def mismatches(self, settings: Dict) -> List[str]:
+        """
+        Parâmetros da execução atual que diferem dos registrados no manifesto.
+        """
+        return [name for name in sorted(set(self.settings) | set(settings))
+                if self.settings.get(name) != settings.get(name)]
+
+    def commit(self, output: str, counters: Dict[str, int], stats: Dict, quarantine: Optional[str] = None):
+        """
+        Registra mais um bloco concluído, depois que ele já foi gravado na saída
+        (e as linhas com erro, no arquivo de quarentena).
+
+        O manifesto é gravado em um arquivo temporário e renomeado, para que
+        uma interrupção no meio da gravação não o corrompa.
+        """
+        self.chunks += 1
+        self.output_size = os.path.getsize(output)
+        self.quarantine_size = os.path.getsize(quarantine) if quarantine and os.path.exists(quarantine) else 0
+        self.counters = dict(counters)
+        self.stats = stats
+
+        data = {
+            'settings': self.settings,
+            'version': self.version,
+            'chunks': self.chunks,
+            'output_size': self.output_size,
+            'quarantine_size': self.quarantine_size,
+            'counters': self.counters,
+            'stats': self.stats,
+        }
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
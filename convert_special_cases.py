@@ -1,265 +1,381 @@
-from normalizar_numeros import Extenso
+from functools import lru_cache
+from normalizar_numeros import EXTENSO
+from pipeline_stats import STATS
+from rule_registry import Rule, RuleSet
 import re
-import inflect
 
 
-def normalize_special_characters(text):
-    # Substituir "&" por " e "
-    text = re.sub(r'(?<=\S)&(?=\S)', ' e ', text)
-    text = re.sub(r'(?<=\s)&(?=\s)', 'e', text)
-
-    # Substituir "+" por " mais " ou "mais"
-    text = re.sub(r'(?<=\S)\+(?=\S)', ' mais ', text)
-    text = re.sub(r'(?<=\s)\+(?=\s)', 'mais', text)
-
-    # Normalizar valores monetários
-    text = normalize_monetary_value(text)
-
-    # Substituir "²" por "ao quadrado"
-    text = re.sub(r'\b(\w+?)²\b', lambda m: f"{m.group(1)} ao quadrado", text)
-
-    # Substitui numeros com '²' para "número ao quadrado" 
-    text = re.sub(r'(\d+)²', lambda m: f"{m.group(1)} ao quadrado", text)
-
-    # Substituir "§" por "parágrafo"
-    text = re.sub(r'§\s*(\d+)', r'parágrafo \1', text)
-
-    # Substituir "π" por "pi"
-    text = re.sub(r'(?<=\d)π', ' pi', text)
-    text = re.sub(r'(?<=\s)π(?=\s)', 'pi', text)
-
-    # Substituir "€" por "euros"
-    text = re.sub(r'(\d+[\d,\.]*)\s*€', r'\1 euros', text)
-
-    # Substituir ordinais
-    text = re.sub(r'(\d+)(º|ª)', lambda match: transcribe_ordinal(int(match.group(1)), match.group(2)), text)
+# Padrões de normalize_special_characters, compilados uma única vez
+AMPERSAND_JOINED_PATTERN = re.compile(r'(?<=\S)&(?=\S)')
+AMPERSAND_ALONE_PATTERN = re.compile(r'(?<=\s)&(?=\s)')
+PLUS_JOINED_PATTERN = re.compile(r'(?<=\S)\+(?=\S)')
+PLUS_ALONE_PATTERN = re.compile(r'(?<=\s)\+(?=\s)')
+WORD_SQUARED_PATTERN = re.compile(r'\b(\w+?)²\b')
+NUMBER_SQUARED_PATTERN = re.compile(r'(\d+)²')
+PARAGRAPH_PATTERN = re.compile(r'§\s*(\d+)')
+# O primeiro grupo indica o "π" colado a um número
+PI_PATTERN = re.compile(r'(?<=\d)(π)|(?<=\s)π(?=\s)')
+EURO_PATTERN = re.compile(r'(\d+[\d,\.]*)\s*€')
+ORDINAL_PATTERN = re.compile(r'(\d+)(º|ª)')
+# Valores em "R$" e "US$" em uma única varredura: moeda, parte inteira (com
+# ou sem ponto de milhar), separador e parte decimal
+MONETARY_PATTERN = re.compile(r'(US|R)\$\s*(\d{1,3}(?:\.\d{3})+(?!\d)|\d+)(?:([,.])(\d+))?')
+# O mesmo padrão com uma palavra de escala opcional ("R$ 5 milhões"), usado
+# apenas nos textos em que alguma palavra de escala aparece
+MONETARY_SCALE_PATTERN = re.compile(
+    MONETARY_PATTERN.pattern + r'(?:\s+(mil|milhão|milhões|bilhão|bilhões|trilhão|trilhões)\b)?'
+)
+
+# Nome de cada moeda no singular e no plural
+CURRENCY_NAMES = {'R': ('real', 'reais'), 'US': ('dólar', 'dólares')}
+
+# Centavos por extenso, de 0 a 99
+CENTAVOS = tuple(EXTENSO.escrever(n).strip() + (' centavo' if n == 1 else ' centavos') for n in range(100))
 
 
-    text = normalize_square_units(text)
+def normalize_special_characters(text):
+    """
+    Normaliza símbolos (&, +, R$, US$, ², §, π, € e ordinais) na ordem em que
+    as regras sempre foram aplicadas. Cada regra só varre o texto quando o
+    seu símbolo está presente, o que é verificado com uma busca simples.
+
+    As regras de "&" e de "+" continuam em passagens separadas porque a
+    substituição de uma pode criar os espaços que a seguinte procura.
+    """
+    if '&' in text:
+        # Substituir "&" por " e "
+        text = AMPERSAND_JOINED_PATTERN.sub(' e ', text)
+        text = AMPERSAND_ALONE_PATTERN.sub('e', text)
+
+    if '+' in text:
+        # Substituir "+" por " mais " ou "mais"
+        text = PLUS_JOINED_PATTERN.sub(' mais ', text)
+        text = PLUS_ALONE_PATTERN.sub('mais', text)
+
+    if '$' in text:
+        # Normalizar valores monetários
+        text = STATS.timed('normalize_monetary_value', normalize_monetary_value, text)
+
+    if '²' in text:
+        # Substituir "²" por "ao quadrado"
+        text = WORD_SQUARED_PATTERN.sub(lambda m: f"{m.group(1)} ao quadrado", text)
+
+    if '²' in text:
+        # Substitui numeros com '²' para "número ao quadrado"
+        text = NUMBER_SQUARED_PATTERN.sub(lambda m: f"{m.group(1)} ao quadrado", text)
+
+    if '§' in text:
+        # Substituir "§" por "parágrafo"
+        text = PARAGRAPH_PATTERN.sub(r'parágrafo \1', text)
+
+    if 'π' in text:
+        # Substituir "π" por "pi"
+        text = PI_PATTERN.sub(lambda m: ' pi' if m.group(1) else 'pi', text)
+
+    if '€' in text:
+        # Substituir "€" por "euros"
+        text = EURO_PATTERN.sub(r'\1 euros', text)
+
+    if 'º' in text or 'ª' in text:
+        # Substituir ordinais
+        text = ORDINAL_PATTERN.sub(lambda match: transcribe_ordinal(int(match.group(1)), match.group(2)), text)
+
+    if '²' in text:
+        text = STATS.timed('normalize_square_units', normalize_square_units, text)
 
     return text
 
 def normalize_monetary_value(text):
-    # Substituir "R$" seguido de valor com ponto ou vírgula
-    text = re.sub(r'R\$\s*(\d+[,\.]?\d*)', lambda m: f"{normalize_number(m.group(1))} reais", text)
-    # Substituir "US$" seguido de valor com ponto ou vírgula 
-    #text = re.sub(r'US\$\s*(\d+[\w\s]*)', r'\1 dólares', text)
-    text = re.sub(r'US\$\s*(\d+[,\.]?\d*)', lambda m: f"{normalize_number(m.group(1))} dólares", text)
-    return text
-
-def normalize_number(number_str):
-    ex = Extenso()
-    parts = number_str.replace('.', ',').split(',')
-
-    if len(parts) == 1:
-        return ex.escrever(int(parts[0]))
-    elif len(parts) == 2:
-        decimal_part = parts[1] if parts[1] else '0'  
-        return f"{ex.escrever(int(parts[0]))} vírgula {ex.escrever(int(decimal_part))}"
-    else:
-        raise ValueError(f"Unexpected format for number: {number_str}")
+    # Substituir "R$" ou "US$" seguido de valor com ponto ou vírgula. Todas as
+    # palavras de escala contêm "mil" ou "ilh" (bilhão, trilhão)
+    pattern = MONETARY_SCALE_PATTERN if 'mil' in text or 'ilh' in text else MONETARY_PATTERN
+    return pattern.sub(lambda m: money_text(m.group()), text)
+
+@lru_cache(maxsize=65536)
+def money_text(value):
+    """
+    Valor monetário reconhecido no texto (ex.: 'R$ 1.250,00') por extenso.
+    O cache é indexado pelo próprio trecho, o que é mais barato do que pelos
+    grupos da correspondência; os grupos só são extraídos na primeira vez.
+    """
+    return money_words(*MONETARY_SCALE_PATTERN.fullmatch(value).groups())
+
+@lru_cache(maxsize=65536)
+def _money_number(number):
+    words = EXTENSO.escrever(number).strip()
+    return 'mil' + words[6:] if words.startswith('um mil') and not words.startswith('um milh') else words
+
+def money_words(currency, integer, separator, decimals, scale=None):
+    """
+    Escreve um valor monetário por extenso, com separador de milhar e
+    centavos no formato brasileiro.
+
+    ----------------------------
+
+    Exemplos: 'R$ 1.250,00' para 'mil duzentos e cinquenta reais',
+    'R$ 2,50' para 'dois reais e cinquenta centavos', 'US$ 1' para 'um
+    dólar' e 'R$ 1,5 bilhão' para 'um vírgula cinco bilhão de reais'
+    """
+    singular, plural = CURRENCY_NAMES[currency]
+    number = int(integer.replace('.', ''))
+
+    if scale:
+        if scale == 'mil' and number == 1 and not decimals:
+            # "R$ 1 mil" é lido "mil reais", e não "um mil reais"
+            return f"mil {plural}"
+        words = _money_number(number)
+        if decimals:
+            words += ' vírgula ' + EXTENSO.escrever_decimais(decimals)
+        return f"{words} {scale} {plural}" if scale == 'mil' else f"{words} {scale} de {plural}"
+
+    # Mais de duas casas decimais não são centavos: lê como número decimal
+    if decimals and len(decimals) > 2:
+        return f"{_money_number(number)} vírgula {EXTENSO.escrever_decimais(decimals)} {plural}"
+
+    cents = int(decimals.ljust(2, '0')) if decimals else 0
+    parts = []
+    if number or not cents:
+        name = singular if number == 1 else plural
+        # "um milhão de reais", mas "um milhão e duzentos mil reais"
+        connector = ' de ' if number and number % 1000000 == 0 else ' '
+        parts.append(_money_number(number) + connector + name)
+    if cents:
+        parts.append(CENTAVOS[cents])
+    return ' e '.join(parts)
+
+# Expressões regulares para capturar números ao quadrado e unidades ao quadrado
+NUMBER_SQUARE_PATTERN = re.compile(r'(\d+(\.\d+)?)\s*²')
+UNIT_SQUARE_PATTERN = re.compile(r'\b(\w+)²\b')
+
+# Dicionário de unidades ao quadrado e suas normalizações
+SQUARE_UNITS = {
+    'm²': 'metro ao quadrado',
+    'km²': 'quilômetro ao quadrado',
+    'g²': 'grama ao quadrado',
+    'kg²': 'quilograma ao quadrado',
+    'l²': 'litro ao quadrado',
+    'cm²': 'centímetro ao quadrado',
+    'mm²': 'milímetro ao quadrado',
+    'ml²': 'mililitro ao quadrado',
+    't²': 'tonelada ao quadrado'
+}
 
 
 def normalize_square_units(text):
-    # Expressões regulares para capturar números ao quadrado e unidades ao quadrado
-    number_square_pattern = re.compile(r'(\d+(\.\d+)?)\s*²')
-    unit_square_pattern = re.compile(r'\b(\w+)²\b')
-
-    # Dicionário de unidades ao quadrado e suas normalizações
-    units_dict = {
-        'm²': 'metro ao quadrado',
-        'km²': 'quilômetro ao quadrado',
-        'g²': 'grama ao quadrado',
-        'kg²': 'quilograma ao quadrado',
-        'l²': 'litro ao quadrado',
-        'cm²': 'centímetro ao quadrado',
-        'mm²': 'milímetro ao quadrado',
-        'ml²': 'mililitro ao quadrado',
-        't²': 'tonelada ao quadrado'
-    }
-
-    # Função para substituir números ao quadrado
-    def replace_number_square(match):
-        number = match.group(1)
-        return f"{number} ao quadrado"
-
-    # Função para substituir unidades ao quadrado
-    def replace_unit_square(match):
-        unit = match.group(0)  # Inclui a unidade completa com "²"
-        return units_dict.get(unit, unit)
-
     # Primeiro, substituímos os números ao quadrado
-    text = number_square_pattern.sub(replace_number_square, text)
-    # Depois, substituímos as unidades de medida ao quadrado
-    text = unit_square_pattern.sub(replace_unit_square, text)
+    text = NUMBER_SQUARE_PATTERN.sub(lambda m: f"{m.group(1)} ao quadrado", text)
+    # Depois, substituímos as unidades de medida ao quadrado (inclui a unidade completa com "²")
+    text = UNIT_SQUARE_PATTERN.sub(lambda m: SQUARE_UNITS.get(m.group(0), m.group(0)), text)
 
     return text
 
 
 
-def transcribe_ordinal(number, gender):
- 
-    base_ordinals_m = {
-        1: "primeiro", 2: "segundo", 3: "terceiro", 4: "quarto",
-        5: "quinto", 6: "sexto", 7: "sétimo", 8: "oitavo", 9: "nono",
-        10: "décimo", 20: "vigésimo", 30: "trigésimo", 40: "quadragésimo",
-        50: "quinquagésimo", 60: "sexagésimo", 70: "septuagésimo",
-        80: "octogésimo", 90: "nonagésimo", 100: "centésimo",
-        200: "ducentésimo", 300: "tricentésimo", 400: "quadringentésimo",
-        500: "quingentésimo", 600: "sexcentésimo", 700: "septingentésimo",
-        800: "octingentésimo", 900: "noningentésimo", 1000: "milésimo"
-    }
-
-    base_ordinals_f = {k: v[:-1] + 'a' for k, v in base_ordinals_m.items()}
-    base_ordinals_f[1] = "primeira"  
-
-    base_ordinals = base_ordinals_m if gender == 'm' else base_ordinals_f
-
-    def get_ordinal(n):
-        if n in base_ordinals:
-            return base_ordinals[n]
-        elif n < 100:
-            tens = n // 10 * 10
-            units = n % 10
-            return base_ordinals[tens] + ' ' + get_ordinal(units)
-        elif n < 1000:
-            hundreds = n // 100 * 100
-            remainder = n % 100
-            if remainder:
-                return base_ordinals[hundreds] + ' ' + get_ordinal(remainder)
-            else:
-                return base_ordinals[hundreds]
+# Tabelas para escrever números em inglês no mesmo formato do inflect
+ENGLISH_UNITS = ('zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
+                 'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen', 'eighteen', 'nineteen')
+ENGLISH_TENS = ('', '', 'twenty', 'thirty', 'forty', 'fifty', 'sixty', 'seventy', 'eighty', 'ninety')
+ENGLISH_SCALES = ('', ' thousand', ' million', ' billion', ' trillion', ' quadrillion', ' quintillion',
+                  ' sextillion', ' septillion', ' octillion', ' nonillion', ' decillion')
 
-    return get_ordinal(number)
+
+@lru_cache(maxsize=None)
+def get_inflect_engine():
+    """
+    Cria o engine do inflect apenas no primeiro uso; a importação do inflect
+    é cara e só é necessária para números além das tabelas em inglês.
+    """
+    import inflect
+    return inflect.engine()
+
+
+def _english_group(number):
+    hundreds, rest = divmod(number, 100)
+    if rest < 20:
+        words = ENGLISH_UNITS[rest] if rest else ''
+    else:
+        tens, unit = divmod(rest, 10)
+        words = ENGLISH_TENS[tens] + ('-' + ENGLISH_UNITS[unit] if unit else '')
+    if hundreds:
+        return ENGLISH_UNITS[hundreds] + ' hundred' + (' and ' + words if words else '')
+    return words
+
+
+@lru_cache(maxsize=4096)
+def english_number_words(number):
+    """
+    Escreve o número por extenso em inglês, com o mesmo resultado de
+    inflect.engine().number_to_words (ex.: 1234 para 'one thousand, two
+    hundred and thirty-four'). O inflect só é usado acima dos decilhões.
+    """
+    if number == 0:
+        return 'zero'
+
+    groups = []
+    rest = number
+    while rest:
+        rest, group = divmod(rest, 1000)
+        groups.append(group)
+    if len(groups) > len(ENGLISH_SCALES):
+        return get_inflect_engine().number_to_words(number)
+
+    words = ''
+    for scale in range(len(groups) - 1, -1, -1):
+        group = groups[scale]
+        if not group:
+            continue
+        if words:
+            words += ' and ' if scale == 0 and group < 100 else ', '
+        words += _english_group(group) + ENGLISH_SCALES[scale]
+    return words
+
+
+# Ordinais básicos, a partir dos quais os demais são compostos
+ORDINAIS_BASE = {
+    1: "primeiro", 2: "segundo", 3: "terceiro", 4: "quarto",
+    5: "quinto", 6: "sexto", 7: "sétimo", 8: "oitavo", 9: "nono",
+    10: "décimo", 20: "vigésimo", 30: "trigésimo", 40: "quadragésimo",
+    50: "quinquagésimo", 60: "sexagésimo", 70: "septuagésimo",
+    80: "octogésimo", 90: "nonagésimo", 100: "centésimo",
+    200: "ducentésimo", 300: "tricentésimo", 400: "quadringentésimo",
+    500: "quingentésimo", 600: "sexcentésimo", 700: "septingentésimo",
+    800: "octingentésimo", 900: "noningentésimo"
+}
+
+# Ordinais das classes de milhar, na mesma ordem de MILHARES
+ORDINAIS_MILHARES = ('', 'milésimo', 'milionésimo', 'bilionésimo', 'trilionésimo', 'quatrilionésimo',
+                     'quintilionésimo', 'sextilionésimo', 'septilionésimo', 'octilionésimo', 'nonilionésimo',
+                     'decilionésimo', 'undecilionésimo', 'duodecilionésimo', 'tredecilionésimo')
+
+
+def _ordinal_grupo(n):
+    """
+    Compõe o ordinal masculino de 1 a 999 (ex.: 125 para 'centésimo
+    vigésimo quinto').
+    """
+    if n in ORDINAIS_BASE:
+        return ORDINAIS_BASE[n]
+    if n < 100:
+        return ORDINAIS_BASE[n // 10 * 10] + ' ' + ORDINAIS_BASE[n % 10]
+    return ORDINAIS_BASE[n // 100 * 100] + ' ' + _ordinal_grupo(n % 100)
+
+
+def _feminino(ordinal):
+    return ' '.join(palavra[:-1] + 'a' for palavra in ordinal.split(' '))
+
+
+# Tabelas com os ordinais de 0 a 999 (o índice 0 fica vazio)
+ORDINAIS_M = ('',) + tuple(_ordinal_grupo(n) for n in range(1, 1000))
+ORDINAIS_F = tuple(_feminino(ordinal) for ordinal in ORDINAIS_M)
+
+
+@lru_cache(maxsize=4096)
+def transcribe_ordinal(number, gender):
+    """
+    Escreve o número ordinal por extenso, no masculino ('m' ou 'º') ou no
+    feminino ('f' ou 'ª').
+
+    ----------------------------
+
+    Exemplos: 21 para 'vigésimo primeiro', 1001 para 'milésimo primeiro',
+    2500 para 'segundo milésimo quingentésimo', 10**6 para 'milionésimo'
+    """
+    masculino = gender in ('m', 'º')
+    if number == 0:
+        return 'zero'
+    if number >= 1000 ** len(ORDINAIS_MILHARES):
+        return EXTENSO.escrever_digitos(str(number))
+
+    grupos = []
+    while number:
+        number, grupo = divmod(number, 1000)
+        grupos.append(grupo)
+
+    palavras = []
+    for classe in range(len(grupos) - 1, -1, -1):
+        grupo = grupos[classe]
+        if not grupo:
+            continue
+        if classe == 0:
+            palavras.append(ORDINAIS_M[grupo])
+        elif grupo == 1:
+            palavras.append(ORDINAIS_MILHARES[classe])
+        else:
+            palavras.append(ORDINAIS_M[grupo] + ' ' + ORDINAIS_MILHARES[classe])
+
+    ordinal = ' '.join(palavras)
+    return ordinal if masculino else _feminino(ordinal)
+
+
+# Regras do Switcher, da maior para a menor prioridade. As prioridades são
+# espaçadas para que plugins possam inserir regras entre as embutidas
+SWITCHER_RULES = RuleSet([
+    # Milhar com ponto
+    Rule('conv_chiliad', r'(\d+)\.(\d{3})', 'conv_chiliad', 1600, ['5.000']),
+    # Horas e minutos
+    Rule('conv_time', r'(\d+)[h\:](\d{0,2})(m|min)?', 'conv_time', 1500, ['2h15', '2:15', '2h', '2h30min']),
+    # Quilometros
+    Rule('conv_kilometers', r'(\d+)[kK][mM]', 'conv_kilometers', 1400, ['5km', '5KM']),
+    # Metros
+    Rule('conv_meters', r'(\d+)m', 'conv_meters', 1300, ['3m']),
+    # Milímetros
+    Rule('conv_millimeters', r'(\d+)mm', 'conv_millimeters', 1200, ['9mm']),
+    # Porcentagem
+    Rule('conv_percentage', r'(\d+)\%', 'conv_percentage', 1100, ['2%']),
+    # Valores flutuantes
+    Rule('conv_float', r'(\d+)([.,])(\d+)', 'conv_float', 1000, ['2,5', '3.14', '2,05', '0,5']),
+    # Ordinais
+    Rule('conv_ordinal', r'(\d+)(º|ª)', 'conv_ordinal', 900, ['1º', '4ª']),
+    # Graus
+    Rule('conv_degrees', r'(\d+)°', 'conv_degrees', 800, ['360°']),
+    # Tecnologia
+    Rule('conv_dimension_technology', r'(\d+)(D|G|g|X)', 'conv_dimension_technology', 700, ['2D', '5G']),
+    # Multiplication
+    Rule('conv_multiplication', r'(\d+)x(\d+)', 'conv_multiplication', 600, ['1x1', '1920x1080']),
+    # Kilograms
+    Rule('conv_kilograms', r'(\d+)[kK][gG]', 'conv_kilograms', 500, ['2kg']),
+    # Bits
+    Rule('conv_bits', r'(\d+)bits', 'conv_bits', 400, ['8bits']),
+    # Numero seguido de letra maiscula
+    Rule('conv_num_letter', r'(\d+)([A-Z])', 'conv_num_letter', 300, ['4A']),
+    # Medidas ao quadrado
+    Rule('conv_square_units', r'(\d+)?(m²|km²)', 'conv_square_units', 200, ['5m²', '10km²']),
+    # Números ordinais em inglês
+    Rule('conv_english_ordinal_pattern', r'(\d+)(st|nd|rd|th)', 'conv_english_ordinal_pattern', 100, ['21st', '4th']),
+])
 
 
 class Switcher():
     def __init__(self, text):
         self.text = text
-        self.pattern = None
+        self.rule = None
         self.method_name = None
+        self.groups = ()
 
     def switch(self):
 
-         # Milhar com ponto
-        chiliad_pattern = re.compile(r'^(\d+)\.(\d{3})$')
-
-        # Horas e minutos
-        time_pattern = re.compile(r'^(\d+)[h\:](\d{0,2})(m|min)?$')
-
-        # Quilometros
-        kilometers_pattern = re.compile(r'^(\d+)[kK][mM]$')
-
-        # Metros
-        meters_pattern = re.compile(r'^(\d+)m$')
-
-        # Milímetros
-        millimeters_pattern = re.compile(r'^(\d+)mm$')
-
-        # Porcentagem
-        percentage_pattern = re.compile(r'^(\d+)\%$')
-
-        # Valores flutuantes
-        float_pattern = re.compile(r'^(\d+)([.,])(\d+)$')
-
-        # Ordinais
-        ordinal_pattern = re.compile(r'^(\d+)(º|ª)$')
-
-        # Graus
-        degree_pattern = re.compile(r'^(\d+)°$')
-
-        # Tecnologia
-        dimension_technology_pattern = re.compile(r'^(\d+)(D|G|g|X)$')
-
-        # Multiplication
-        multiplication_pattern = re.compile(r'^(\d+)x(\d+)$')
+        found = SWITCHER_RULES.match(self.text)
 
-        # Kilograms
-        kilograms_pattern = re.compile(r'^(\d+)[kK][gG]$')
+        if found:
+            self.rule, self.groups = found
+            self.method_name = self.rule.name
 
-        # Bits
-        bits_pattern = re.compile(r'^(\d+)bits$')
-
-        # Numero seguido de letra maiscula
-        num_letter_pattern = re.compile(r'^(\d+)([A-Z])$')
-
-        # Números ordinais em inglês
-        english_ordinal_pattern = re.compile(r'^(\d+)(st|nd|rd|th)$')
-
-        square_units_pattern = re.compile(r'^(\d+)?(m²|km²)$')
-
-        if chiliad_pattern.match(self.text):
-            self.method_name = 'conv_chiliad'
-            self.pattern = chiliad_pattern
-
-        elif time_pattern.match(self.text):
-            self.method_name = 'conv_time'
-            self.pattern = time_pattern
-
-        elif kilometers_pattern.match(self.text):
-            self.method_name = 'conv_kilometers'
-            self.pattern = kilometers_pattern
-
-        elif meters_pattern.match(self.text):
-            self.method_name = 'conv_meters'
-            self.pattern = meters_pattern
-
-        elif millimeters_pattern.match(self.text):  # New case for millimeters
-            self.method_name = 'conv_millimeters'
-            self.pattern = millimeters_pattern
-
-        elif percentage_pattern.match(self.text):
-            self.method_name = 'conv_percentage'
-            self.pattern = percentage_pattern
-
-        elif float_pattern.match(self.text):
-            self.method_name = 'conv_float'
-            self.pattern = float_pattern
-
-        elif ordinal_pattern.match(self.text):  # Handling for ordinal numbers
-            self.method_name = 'conv_ordinal'
-            self.pattern = ordinal_pattern
-
-        elif degree_pattern.match(self.text):
-            self.method_name = 'conv_degrees'
-            self.pattern = degree_pattern
-
-        elif dimension_technology_pattern.match(self.text):
-            self.method_name = 'conv_dimension_technology'
-            self.pattern = dimension_technology_pattern
-
-        elif multiplication_pattern.match(self.text):
-            self.method_name = 'conv_multiplication'
-            self.pattern = multiplication_pattern
-
-        elif kilograms_pattern.match(self.text):
-            self.method_name = 'conv_kilograms'
-            self.pattern = kilograms_pattern
-
-        elif bits_pattern.match(self.text):
-            self.method_name = 'conv_bits'
-            self.pattern = bits_pattern
-
-        elif num_letter_pattern.match(self.text):  # Check the new pattern
-            self.method_name = 'conv_num_letter'
-            self.pattern = num_letter_pattern
-            
-        elif square_units_pattern.match(self.text):
-            self.method_name = 'conv_square_units'
-            self.pattern = square_units_pattern
-
-        elif english_ordinal_pattern.match(self.text):
-            self.method_name = 'conv_english_ordinal_pattern'
-            self.pattern = english_ordinal_pattern
-
-        if self.method_name:
-
-            method = getattr(self, self.method_name, lambda: 'Invalido')
+            if isinstance(self.rule.converter, str):
+                method = getattr(self, self.rule.converter, lambda: 'Invalido')
+            else:
+                method = self.convert_with_plugin
 
-            return method()
+            return STATS.timed('switcher.' + self.method_name, method)
 
         return self.text, False
 
+    def convert_with_plugin(self):
+        # Regras de plugins recebem os grupos e devolvem o texto convertido
+        converted = self.rule.converter(*self.groups)
+        if converted is None:
+            return self.text, False
+        return converted, True
+
     def conv_meters(self):
         """
         Converte expressoes de medida para o seu correspondente por extenso
@@ -269,11 +385,7 @@ class Switcher():
         Exemplos: '3m' para 'três metros'
         """
 
-        ex = Extenso()
-
-        conv_meters = self.pattern.findall(self.text)
-
-        return ex.escrever(int(conv_meters[0])) + ' ' + 'metros', True
+        return EXTENSO.escrever(int(self.groups[0])) + ' ' + 'metros', True
 
     def conv_chiliad(self):
         """
@@ -284,13 +396,9 @@ class Switcher():
         Exemplos: '5.000' para 'cinco mil'
         """
 
-        ex = Extenso()
-
-        conv_num = self.pattern.findall(self.text)
+        num = self.groups[0] + self.groups[1]
 
-        num = conv_num[0][0]+conv_num[0][1]
-
-        return ex.escrever(int(num)), True
+        return EXTENSO.escrever(int(num)), True
 
     def conv_time(self):
         """
@@ -301,8 +409,6 @@ class Switcher():
         Exemplos: '2:15' ou '2h15' para 'duas horas e quinze minutos' ou
         '2h' para 'duas horas'
         """
-        ex = Extenso()
-
         hour_plural = 'horas'
         hour_singular = 'hora'
         minute_plural = 'minutos'
@@ -312,14 +418,14 @@ class Switcher():
         hours = ''
         minutes = ''
 
-        conv_time = self.pattern.findall(self.text)
+        conv_time = self.groups
 
-        hours = int(conv_time[0][0])
-        hours = ex.escrever(hours).replace('um', 'uma').replace('dois', 'duas')
+        hours = int(conv_time[0])
+        hours = EXTENSO.escrever(hours).replace('um', 'uma').replace('dois', 'duas')
 
-        if conv_time[0][1]:
-            minutes = int(conv_time[0][1])
-            minutes = ex.escrever(minutes)
+        if conv_time[1]:
+            minutes = int(conv_time[1])
+            minutes = EXTENSO.escrever(minutes)
 
             if minutes == 'um':
                 second_part = minutes + ' ' + minute_singular
@@ -347,18 +453,13 @@ class Switcher():
         Exemplos: '2%' para 'dois por cento'
         """
 
-        ex = Extenso()
-
-        num = self.pattern.findall(self.text)
-
-        return ex.escrever(int(num[0])) + ' ' + 'por cento', True
+        return EXTENSO.escrever(int(self.groups[0])) + ' ' + 'por cento', True
 
     def conv_float(self):
         # Converte expressões flutuantes
-        ex = Extenso()
-        broken_values = self.pattern.findall(self.text)
-        first_num = ex.escrever(int(broken_values[0][0]))
-        second_num = ex.escrever(int(broken_values[0][1]))
+        first_value, _, second_value = self.groups
+        first_num = EXTENSO.escrever(int(first_value))
+        second_num = EXTENSO.escrever_decimais(second_value)
         punctuation = 'ponto' if '.' in self.text else 'vírgula'
         return first_num + ' ' + punctuation + ' ' + second_num, True
     
@@ -368,10 +469,8 @@ class Switcher():
         Converte expressões numéricas ordinais para o seu correspondente por extenso
         Exemplos: '1º' para 'primeiro', '4ª' para 'quarta'
         """
-        ex = Extenso()
-        match = self.pattern.findall(self.text)
-        num = int(match[0][0])
-        gender = match[0][1]
+        num = int(self.groups[0])
+        gender = self.groups[1]
 
         if gender == 'º':  # ordinal masculino
             return transcribe_ordinal(num, 'm'), True
@@ -386,10 +485,7 @@ class Switcher():
 
         Exemplos: '360°' para 'trezentos e sessenta graus'
         """
-        ex = Extenso()
-        degrees = self.pattern.findall(self.text)
-
-        return ex.escrever(int(degrees[0])) + ' graus', True
+        return EXTENSO.escrever(int(self.groups[0])) + ' graus', True
 
     def conv_dimension_technology(self):
         """
@@ -398,13 +494,10 @@ class Switcher():
         Examples: '2D' to 'dois D', '5G' to 'cinco G'
         """
 
-        ex = Extenso()
-
-        matched = self.pattern.findall(self.text)
-        number = int(matched[0][0])
-        letter = matched[0][1]
+        number = int(self.groups[0])
+        letter = self.groups[1]
 
-        number_in_full = ex.escrever(number)
+        number_in_full = EXTENSO.escrever(number)
 
         return number_in_full + ' ' + letter, True
 
@@ -416,14 +509,12 @@ class Switcher():
 
         Examples: '1x1' to 'um por um', '7x8' to 'sete por oito'
         """
-        ex = Extenso()
-
         # Find the numbers in the expression
-        nums = self.pattern.findall(self.text)
+        nums = self.groups
 
         # Convert each number to its word form
-        first_num = ex.escrever(int(nums[0][0]))
-        second_num = ex.escrever(int(nums[0][1]))
+        first_num = EXTENSO.escrever(int(nums[0]))
+        second_num = EXTENSO.escrever(int(nums[1]))
 
         # Combine with 'por' in between
         return first_num + ' por ' + second_num, True
@@ -433,9 +524,7 @@ class Switcher():
         Converte expressões de quilogramas para o seu correspondente por extenso
         Exemplos: '2kg' para 'dois quilogramas'
         """
-        ex = Extenso()
-        num = self.pattern.findall(self.text)
-        return ex.escrever(int(num[0])) + ' quilogramas', True
+        return EXTENSO.escrever(int(self.groups[0])) + ' quilogramas', True
 
     def conv_bits(self):
         """
@@ -443,11 +532,8 @@ class Switcher():
 
         Exemplos: '8bits' para 'oito bits'
         """
-        ex = Extenso()
-
-        match = self.pattern.findall(self.text)
-        number = int(match[0])  # Extract the number from the pattern
-        return ex.escrever(number) + ' bits', True
+        number = int(self.groups[0])  # Extract the number from the pattern
+        return EXTENSO.escrever(number) + ' bits', True
 
     def conv_num_letter(self):
         """
@@ -456,11 +542,9 @@ class Switcher():
 
         Example: '4A' to 'quatro A'
         """
-        ex = Extenso()
-        match = self.pattern.findall(self.text)
-        number = int(match[0][0])
-        letter = match[0][1]
-        return ex.escrever(number) + ' ' + letter, True
+        number = int(self.groups[0])
+        letter = self.groups[1]
+        return EXTENSO.escrever(number) + ' ' + letter, True
 
     def conv_millimeters(self):
         """
@@ -470,11 +554,10 @@ class Switcher():
 
         Exemplos: '9mm' para 'nove milímetros'
         """
-        ex = Extenso()
-        mm = self.pattern.findall(self.text)
+        mm = self.groups
         if mm:
             number = int(mm[0])
-            return ex.escrever(number) + ' milímetros', True
+            return EXTENSO.escrever(number) + ' milímetros', True
 
     def conv_kilometers(self):
         """
@@ -484,11 +567,10 @@ class Switcher():
 
         Exemplos: '5km' para 'cinco quilômetros'
         """
-        ex = Extenso()
-        km = self.pattern.findall(self.text)
+        km = self.groups
         if km:
             number = int(km[0])
-            return ex.escrever(number) + ' quilômetros', True
+            return EXTENSO.escrever(number) + ' quilômetros', True
 
     def conv_english_ordinal_pattern(self):
         """
@@ -498,18 +580,14 @@ class Switcher():
 
         Exemplos: '21st' para 'twenty-first'
         """
-        p = inflect.engine()
-        conv_num = self.pattern.findall(self.text)
-        number = int(conv_num[0][0])
-        ordinal_word = p.number_to_words(number)
+        number = int(self.groups[0])
+        ordinal_word = english_number_words(number)
         return ordinal_word, True
     
     def conv_square_units(self):
         # Converte medidas ao quadrado
-        ex = Extenso()
-        match = self.pattern.findall(self.text)
-        number = match[0][0] if match[0][0] else 'um'
-        unit = match[0][1]
-        number_in_full = ex.escrever(int(number)) if number.isdigit() else number
+        number = self.groups[0] if self.groups[0] else 'um'
+        unit = self.groups[1]
+        number_in_full = EXTENSO.escrever(int(number)) if number.isdigit() else number
         unit_in_full = 'metros quadrados' if unit == 'm²' else 'quilômetros quadrados'
         return f"{number_in_full} {unit_in_full}", True
\ No newline at end of file
@@ -1,28 +1,81 @@
 import os
 import argparse
-from typing import List
+import itertools
+from collections import deque
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
 import re 
 from typing import Tuple
-import pandas as pd
-from tqdm import tqdm
 
-from normalizar_numeros import Extenso
-from convert_special_cases import Switcher, normalize_special_characters, transcribe_ordinal
+from checkpoint import RESUMABLE_FORMATS, Checkpoint, manifest_path
+from normalizar_numeros import EXTENSO
+from convert_special_cases import SWITCHER_RULES, Switcher, normalize_special_characters, transcribe_ordinal
+from normalization_cache import NormalizationCache, rules_version
+from pipeline_stats import STATS, enable_profiling, failed_stage
+from rule_registry import load_plugin, plugins_version
+from table_io import FORMATS, TableWriter, detect_format, read_chunks, read_schema
 
 import unicodedata
 
 
 punctuation_pattern = ['…', '...', '"', "'", ';', ',', '.', '!', '?', ')', '(', '-', '–', '—', '“', '”', '‘', '’', '´', '¨', '˜', '´', '´´', '``', '´´´', '´´´´', '´´´´´', '´´´´´´', '´´´´´´´', '´´´´´´´´', '´´´´´´´´´']
 
+# Caracteres aceitos nas transcrições normalizadas
+VALID_CHARACTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz" \
+                   "\u00a1\u00a3\u00b7\u00b8\u00c0\u00c1\u00c2\u00c3\u00c4\u00c5\u00c7" \
+                   "\u00c8\u00c9\u00ca\u00cb\u00cc\u00cd\u00ce\u00cf\u00d1\u00d2\u00d3" \
+                   "\u00d4\u00d5\u00d6\u00d9\u00da\u00db\u00dc\u00df\u00e0\u00e1\u00e2" \
+                   "\u00e3\u00e4\u00e5\u00e7\u00e8\u00e9\u00ea\u00eb\u00ec\u00ed\u00ee" \
+                   "\u00ef\u00f1\u00f2\u00f3\u00f4\u00f5\u00f6\u00f9\u00fa\u00fb\u00fc" \
+                   "\u0101\u0104\u0105\u0106\u0107\u010b\u0119\u0141\u0142\u0143\u0144" \
+                   "\u0152\u0153\u015a\u015b\u0161\u0178\u0179\u017a\u017b\u017c\u020e" \
+                   "\u04e7\u05c2\u1b20&+*§π€$²"
+
+VALID_PUNCTUATION = "…\"';,:.!?)(-–—´¨˜`"
+
+# Qualquer caractere fora dos conjuntos acima (ou do espaço) invalida a linha
+INVALID_CHARACTER_PATTERN = re.compile('[^ ' + re.escape(VALID_CHARACTERS + VALID_PUNCTUATION) + ']')
+
 def parse_arguments():
     """
-    Parse command line arguments for input and output file paths
+    Parse command line arguments for input and output files, formats and streaming options
     """
     parser = argparse.ArgumentParser(description='Text normalization script for podcast transcriptions')
     parser.add_argument('--input', '-i', type=str, required=True,
-                      help='Input CSV file path containing podcast transcriptions')
+                      help='Input file path (CSV, Parquet, Arrow or JSONL) containing podcast transcriptions')
     parser.add_argument('--output', '-o', type=str, required=True,
-                      help='Output path for the normalized CSV file')
+                      help='Output path for the normalized file')
+    parser.add_argument('--format', '-f', type=str, choices=FORMATS, default=None,
+                      help='Format of the input and output files (default: detected from the file extension)')
+    parser.add_argument('--output-format', type=str, choices=FORMATS, default=None,
+                      help='Format of the output file, when different from --format')
+    parser.add_argument('--columns', '-c', type=str, nargs='+', default=['transcription-whisper'],
+                      help='Transcription columns to normalize in a single pass (default: transcription-whisper)')
+    parser.add_argument('--output-columns', type=str, nargs='+', default=None,
+                      help='Names of the normalized columns, one per --columns entry '
+                           '(default: whisper_normalizado for transcription-whisper, <column>_normalizado otherwise)')
+    parser.add_argument('--keep-columns', type=str, nargs='*', default=None,
+                      help='Columns to load and pass through to the output besides the transcriptions (default: all)')
+    parser.add_argument('--chunksize', type=int, default=None,
+                      help='Number of rows to read, normalize and write at a time (default: whole file)')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                      help='Number of worker processes used for normalization (default: 1)')
+    parser.add_argument('--cache', type=str, default=None,
+                      help='SQLite file used to cache normalized texts between runs')
+    parser.add_argument('--digit-threshold', type=int, default=DIGIT_THRESHOLD,
+                      help='Digit strings longer than this (phone numbers, IDs) are read digit by digit; '
+                           f'0 reads them as numbers (default: {DIGIT_THRESHOLD})')
+    parser.add_argument('--rules', type=str, nargs='+', default=[],
+                      help='Rule plugin files (Python or YAML) with extra Switcher rules and units')
+    parser.add_argument('--quarantine', type=str, default=None,
+                      help='JSONL file that receives the rows whose normalization raised an error, '
+                           'with the column, stage and error (default: <output>.quarantine.jsonl)')
+    parser.add_argument('--resume', action='store_true',
+                      help='Continue an interrupted run from the last chunk recorded in the checkpoint '
+                           'manifest next to the output (CSV and JSONL outputs only)')
+    parser.add_argument('--profile', type=str, nargs='?', const='-', default=None,
+                      help='Measure calls and time per stage and Switcher rule and write a JSON report '
+                           'to the given file (default: stdout)')
     return parser.parse_args()
 
 def normalize_text(text):
@@ -33,182 +86,641 @@ def normalize_text(text):
     return normalized_text
 
 
+def fuse_replacements(replacements, boundary=''):
+    """
+    Funde uma cadeia de substituições em uma única alternância pré-compilada.
+
+    Cada chave é mapeada para o resultado de aplicar a cadeia inteira a ela,
+    e as chaves mais longas são tentadas primeiro, de modo que uma única
+    varredura reproduz a aplicação sequencial das regras.
+    """
+    def apply_chain(text):
+        for old, new in replacements:
+            text = re.sub(boundary + re.escape(old) + boundary, new, text)
+        return text
+
+    table = {old: apply_chain(old) for old, _ in replacements}
+    alternation = '|'.join(re.escape(old) for old in sorted(table, key=len, reverse=True))
+    pattern = re.compile(f'{boundary}(?:{alternation}){boundary}')
+    return pattern, table
+
+# Correções de encoding, na ordem em que eram aplicadas
+ENCODING_REPLACEMENTS = (
+    ('Ã©', 'é'), ('Ã¡', 'á'), ('Ãª', 'ê'),
+    ('Ã£', 'ã'), ('Ã³', 'ó'), ('Ã', 'à'),
+    ('Ã§', 'ç'), ('Ãº', 'ú'), ('Ãµ', 'õ'),
+    ('Ã¤', 'ä'), ('Ã¶', 'ö'), ('Ã¼', 'ü'),
+    ('Ã¢', 'â'), ('Ã®', 'î'), ('Ã´', 'ô'),
+    ('Â', ''), ('â', 'a'),
+)
+
+# Unidades de medida e suas formas por extenso
+UNITS_MAP = (
+    ('km', 'quilômetros'),
+    ('ml', 'mililitros'),
+    ('kg', 'quilogramas'),
+    ('cm', 'centímetros'),
+    ('mm', 'milímetros'),
+    ('ºC', 'graus Celsius'),
+    ('km/h', 'quilômetros por hora'),
+    ('m/s', 'metros por segundo'),
+)
+
+ENCODING_PATTERN, ENCODING_TABLE = fuse_replacements(ENCODING_REPLACEMENTS)
+UNITS_PATTERN, UNITS_TABLE = fuse_replacements(UNITS_MAP, boundary=r'\b')
+
 def correct_encoding_issues(text):
     """
     Corrige problemas de encoding, como substituição de caracteres mal codificados.
     """
-    text = text.replace('Ã©', 'é').replace('Ã¡', 'á').replace('Ãª', 'ê')
-    text = text.replace('Ã£', 'ã').replace('Ã³', 'ó').replace('Ã', 'à')
-    text = text.replace('Ã§', 'ç').replace('Ãº', 'ú').replace('Ãµ', 'õ')
-    text = text.replace('Ã¤', 'ä').replace('Ã¶', 'ö').replace('Ã¼', 'ü')
-    text = text.replace('Ã¢', 'â').replace('Ã®', 'î').replace('Ã´', 'ô')
-    text = text.replace('Â', '').replace('â', 'a')  
-    return text
+    return ENCODING_PATTERN.sub(lambda m: ENCODING_TABLE[m.group(0)], text)
 
 def normalize_units(text):
-    units_map = {
-        r'\bkm\b': 'quilômetros', 
-        r'\bml\b': 'mililitros', 
-        r'\bkg\b': 'quilogramas',
-        r'\bcm\b': 'centímetros', 
-        r'\bmm\b': 'milímetros', 
-        r'\bºC\b': 'graus Celsius',
-        r'\bkm/h\b': 'quilômetros por hora', 
-        r'\bm/s\b': 'metros por segundo'
-    }
-    
-    for unit_pattern, full_unit in units_map.items():
-        text = re.sub(unit_pattern, full_unit, text)
-    
-    return text
+    return UNITS_PATTERN.sub(lambda m: UNITS_TABLE[m.group(0)], text)
+
+# Unidades embutidas, sem as dos plugins
+BUILTIN_UNITS_MAP = UNITS_MAP
+
+def register_units(units):
+    """
+    Acrescenta unidades de plugins à cadeia de substituições e recompila o
+    padrão. As unidades dos plugins entram antes das embutidas, para que uma
+    unidade como 'km/l' não seja reescrita antes pela embutida 'km'.
+    """
+    global UNITS_MAP, UNITS_PATTERN, UNITS_TABLE
+    plugin_units = UNITS_MAP[:len(UNITS_MAP) - len(BUILTIN_UNITS_MAP)]
+    UNITS_MAP = plugin_units + tuple(units.items()) + BUILTIN_UNITS_MAP
+    UNITS_PATTERN, UNITS_TABLE = fuse_replacements(UNITS_MAP, boundary=r'\b')
+
+# Plugins de regras já carregados neste processo
+LOADED_RULE_PLUGINS: List[str] = []
+
+def load_rule_plugins(paths: Iterable[str]):
+    """
+    Carrega plugins de regras (Python ou YAML), acrescentando as regras ao
+    Switcher e as unidades a normalize_units. Cada arquivo é carregado uma
+    única vez por processo, então os workers podem chamá-la novamente.
+    """
+    for path in paths:
+        path = os.path.abspath(path)
+        if path in LOADED_RULE_PLUGINS:
+            continue
+        plugin = load_plugin(path)
+        SWITCHER_RULES.extend(plugin.rules)
+        register_units(plugin.units)
+        LOADED_RULE_PLUGINS.append(path)
+
+def validate_rules() -> List[str]:
+    """
+    Valida as regras do Switcher e as unidades. Como as unidades são
+    aplicadas em cadeia, uma unidade fica encoberta quando uma anterior já
+    reescreve parte dela (ex.: 'km' antes de 'km/h'); nas unidades embutidas
+    isso é apenas um aviso, para manter o comportamento atual.
+    """
+    issues = SWITCHER_RULES.validate()
+    for unit, full_unit in UNITS_MAP:
+        if UNITS_TABLE[unit] != full_unit:
+            level = 'AVISO' if (unit, full_unit) in BUILTIN_UNITS_MAP else 'ERRO'
+            issues.append(f"{level}: unidade {unit!r} é encoberta por uma unidade anterior "
+                          f"e vira {UNITS_TABLE[unit]!r} em vez de {full_unit!r}")
+    return issues
+
+# Pontuação removida das bordas de cada palavra antes da conversão
+TOKEN_PUNCTUATION = '…."\';,!?)(-_$'
+
+# Sequências de dígitos mais longas que isso (telefones, documentos, IDs) são
+# lidas dígito a dígito; com None, são lidas como número até o máximo do Extenso
+DIGIT_THRESHOLD = 9
+
+def set_digit_threshold(threshold: Optional[int]):
+    global DIGIT_THRESHOLD
+    DIGIT_THRESHOLD = threshold or None
+
+def init_worker(profiling: bool, digit_threshold: Optional[int], rule_plugins: Iterable[str] = ()):
+    """
+    Inicializa os workers com as mesmas opções do processo principal.
+    """
+    enable_profiling(profiling)
+    set_digit_threshold(digit_threshold)
+    load_rule_plugins(rule_plugins)
+
+# Palavras (sequências sem espaço) que contêm ao menos um dígito
+NUMERIC_TOKEN_PATTERN = re.compile(r'(?<!\S)[^\s\d]*\d\S*')
+
+def convert_token(token):
+    """
+    Converte uma palavra que contém dígitos para sua forma por extenso,
+    preservando a pontuação das bordas. Retorna a própria palavra quando
+    nenhuma regra se aplica.
+    """
+    word = token.strip(TOKEN_PUNCTUATION)
+    if not word or not word[0].isdigit():
+        return token
+
+    if word.isdigit():
+        try:
+            number = int(word)
+        except ValueError:
+            return token
+        if DIGIT_THRESHOLD is not None and len(word) > DIGIT_THRESHOLD:
+            STATS.count('numbers.digit_by_digit')
+            new_word = EXTENSO.escrever_digitos(word)
+        elif number > EXTENSO._numero_maximo:
+            STATS.count('numbers.skipped')
+            return token
+        else:
+            new_word = EXTENSO.escrever(number).strip()
+    else:
+        new_word, modified = STATS.timed('switcher', Switcher(word).switch)
+        if new_word is None or not modified:
+            return token
+        new_word = ' '.join(new_word.split())
+
+    start = token.index(word)
+    return token[:start] + new_word + token[start + len(word):]
+
+def convert_numbers(text):
+    """
+    Reescreve as palavras com números em uma única passagem pelo texto.
+    """
+    return NUMERIC_TOKEN_PATTERN.sub(lambda m: convert_token(m.group(0)), text)
+
+# Caracteres sem os quais nenhuma regra de normalize_special_characters se
+# aplica: as demais (R$, US$, §, €, º, ª) exigem também um dígito
+SPECIAL_TRIGGER_PATTERN = re.compile(r'[\d&+²π]')
+
+DIGIT_PATTERN = re.compile(r'\d')
 
 def treat_specific_cases(text):
     """
     Função baseada e adaptada de normalizar números
     Converte casos específicos, incluindo a normalização de números e unidades de medida.
+
+    As palavras com números são reescritas em uma única passagem da esquerda
+    para a direita, cada uma no seu próprio trecho do texto.
+
+    A maioria das linhas não tem dígitos nem símbolos especiais; nesse caso
+    uma única busca por caractere basta para pular as etapas correspondentes.
     """
-   
-    text = normalize_special_characters(text)
-    
-    
-    punctuation = ['…', '...', '"', "'", ';', ',', '.', '!', '?', ')', '(', '-', '_', '$']
-
-    past_word = []
-    conv_word = []
-
-    ex = Extenso()
-    had_changed = False
-    numbers_list = dict()
-
-    for word in text.split(' '):
-        for p in punctuation:
-            word = word.replace(p, '')
-        if word.isdigit():
-            had_changed = True
-            try:
-                if int(word) <= ex._numero_maximo:
-                    numbers_list[word] = ex.escrever(int(word))
-                else:
-                    print(f"Skipping large number: {word}")
-            except ValueError:
-                continue
+    STATS.count('fast_path.texts')
 
-        else:
-            for i in range(2):
-                for p in punctuation:
-                    word = word.lstrip(p)
-                    word = word.rstrip(p)
-            if word and word[0].isdigit():
-                switch = Switcher(word)
-                new_word, modified = switch.switch()
-                if new_word is not None:
-                    new_word = ' '.join(new_word.split())
-                    if modified:
-                        past_word.append(word)
-                        conv_word.append(new_word)
-
-    if had_changed:
-        for number, string_number in numbers_list.items():
-            text = text.replace(number, string_number.strip())
-
-    if past_word and conv_word:
-        for past, conv in zip(past_word, conv_word):
-            text = text.replace(past, conv)
-    
-    text = normalize_units(text)
+    if SPECIAL_TRIGGER_PATTERN.search(text):
+        text = STATS.timed('normalize_special_characters', normalize_special_characters, text)
+    else:
+        STATS.count('fast_path.skipped_special_characters')
+
+    if DIGIT_PATTERN.search(text):
+        text = STATS.timed('token_scan', convert_numbers, text)
+    else:
+        STATS.count('fast_path.skipped_token_scan')
+
+    text = STATS.timed('normalize_units', normalize_units, text)
 
     return text
 
-def get_words(texts: List[str]) -> List[str]:
+def batched(iterable: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+class NormalizationError(NamedTuple):
+    text: str
+    stage: str
+    error: str
+
+def normalize_isolated(text, errors: List[NormalizationError]) -> Optional[str]:
+    """
+    Normaliza um texto sem deixar que uma falha interrompa o lote: o erro é
+    registrado em errors, com a etapa mais interna em que ocorreu, e o
+    resultado do texto é None.
+    """
+    try:
+        return STATS.timed('treat_specific_cases', treat_specific_cases, text)
+    except Exception as e:
+        stage = failed_stage(e, 'treat_specific_cases')
+        STATS.count('errors')
+        STATS.count(f'errors.{stage}')
+        errors.append(NormalizationError(text, stage, f"{type(e).__name__}: {e}"))
+        return None
+
+def normalize_chunk(texts: List[str]):
+    """
+    Normaliza um lote dentro de um worker e devolve, junto com o resultado,
+    as estatísticas medidas no lote para serem somadas no processo principal.
+    """
+    normalized = [STATS.timed('treat_specific_cases', treat_specific_cases, text) for text in texts]
+    return normalized, STATS.pop_snapshot()
+
+def normalize_chunk_isolated(texts: List[str]):
+    """
+    Como normalize_chunk, mas devolve também os erros dos textos que falharam.
+    """
+    errors = []
+    normalized = [normalize_isolated(text, errors) for text in texts]
+    return normalized, STATS.pop_snapshot(), errors
+
+def normalize_batch(texts: Iterable[str], pool: Optional[Pool] = None, batch_size: int = 64,
+                    errors: Optional[List[NormalizationError]] = None,
+                    max_pending: Optional[int] = None) -> Iterator[Optional[str]]:
+    """
+    Normaliza os textos de qualquer iterável (lista, linhas de arquivo,
+    pandas Series) e devolve os resultados sob demanda, na mesma ordem.
+
+    As regras e tabelas são compiladas uma única vez na importação do módulo
+    e reaproveitadas entre os itens. Se um pool de processos for informado,
+    os textos são enviados aos workers em lotes de batch_size, com no máximo
+    max_pending lotes em andamento (por padrão, dois por worker): o iterável
+    só é lido adiante à medida que os resultados são consumidos.
+
+    Sem errors, uma exceção na normalização de um texto interrompe a
+    iteração. Com uma lista em errors, os textos que falharem devolvem None
+    e os erros são acrescentados à lista, na ordem dos textos.
+    """
+    if pool is None:
+        for text in texts:
+            if errors is None:
+                yield STATS.timed('treat_specific_cases', treat_specific_cases, text)
+            else:
+                yield normalize_isolated(text, errors)
+        return
+
+    function = normalize_chunk if errors is None else normalize_chunk_isolated
+    if max_pending is None:
+        max_pending = 2 * pool._processes
+    pending = deque()
+    for batch in batched(texts, batch_size):
+        pending.append(pool.apply_async(function, (batch,)))
+        if len(pending) >= max_pending:
+            yield from chunk_result(pending.popleft().get(), errors)
+    while pending:
+        yield from chunk_result(pending.popleft().get(), errors)
+
+def chunk_result(result: Tuple, errors: Optional[List[NormalizationError]]) -> List[Optional[str]]:
+    """
+    Incorpora os contadores (e os erros) de um lote normalizado por um worker
+    e devolve os textos normalizados.
+    """
+    STATS.merge(result[1])
+    if errors is not None:
+        errors.extend(result[2])
+    return result[0]
+
+def factorize_texts(texts: List[str]) -> Tuple[List[int], List[str]]:
+    """
+    Separa os textos em códigos e valores únicos (na ordem da primeira
+    ocorrência), de forma que texts[i] == uniques[codes[i]].
+
+    Valores ausentes (NaN) entram como um valor único próprio, para que
+    continuem sendo tratados pela normalização como antes.
+    """
+    import pandas as pd
+
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
+    uniques = uniques.tolist()
+    missing = codes < 0
+    if missing.any():
+        codes[missing] = len(uniques)
+        uniques.append(texts[int(missing.argmax())])
+    return codes, uniques
+
+def get_words(texts: List[str], pool: Optional[Pool] = None, batch_size: int = 64,
+              cache: Optional[NormalizationCache] = None,
+              errors: Optional[Dict[int, NormalizationError]] = None) -> List[Optional[str]]:
     """
     Funcao baseada e adaptada de normalizar números
 
-    Separa as palavras de um texto e as retorna em uma lista
+    Separa as palavras de um texto e as retorna em uma lista. Se um pool de
+    processos for informado, os textos são enviados aos workers em lotes de
+    batch_size, mantendo a ordem original. Com um cache, apenas os textos
+    que ainda não estão nele são normalizados.
+
+    Textos repetidos (comuns nas alucinações do Whisper, como "Obrigado.")
+    são normalizados uma única vez e o resultado é replicado para todas as
+    ocorrências.
+
+    Com um dicionário em errors, um texto cuja normalização falha não
+    interrompe os demais: o resultado dele é None e o erro é registrado em
+    errors, indexado pela posição de cada ocorrência em texts.
     """
 
-    new_texts = []
-    for text in tqdm(texts):
-        new_texts.append(treat_specific_cases(text))
+    from tqdm import tqdm
+
+    codes, unique_texts = factorize_texts(texts)
+    STATS.count('texts', len(texts))
+    STATS.count('unique_texts', len(unique_texts))
+
+    failures = None if errors is None else []
+    if cache is None:
+        normalized = list(tqdm(normalize_batch(unique_texts, pool, batch_size, failures), total=len(unique_texts)))
+    else:
+        # Células vazias (NaN) não têm texto para indexar no cache; seguem
+        # para a normalização, que as envia à quarentena
+        normalized = [None] * len(unique_texts)
+        cacheable = [idx for idx, text in enumerate(unique_texts) if isinstance(text, str)]
+        for idx, text in zip(cacheable, cache.get_many([unique_texts[idx] for idx in cacheable])):
+            normalized[idx] = text
+        missing = [idx for idx, text in enumerate(normalized) if text is None]
+        missing_texts = [unique_texts[idx] for idx in missing]
+
+        new_texts = list(tqdm(normalize_batch(missing_texts, pool, batch_size, failures), total=len(missing)))
+        for idx, text in zip(missing, new_texts):
+            normalized[idx] = text
+        cache.put_many((text, new) for text, new in zip(missing_texts, new_texts)
+                       if isinstance(text, str) and new is not None)
+
+    if failures:
+        # Os erros chegam na ordem dos textos, a mesma das falhas em normalized
+        failed = dict(zip((idx for idx, text in enumerate(normalized) if text is None), failures))
+        errors.update((position, failed[code]) for position, code in enumerate(codes) if code in failed)
+
+    return [normalized[code] for code in codes]
+
+def reuse_ratio() -> float:
+    """
+    Fração dos textos processados que foi reaproveitada por ser repetida.
+    """
+    texts = STATS.counters['texts']
+    return 1 - STATS.counters['unique_texts'] / texts if texts else 0.0
+
+def remove_invalid_rows(df, counters, columns=('whisper_normalizado',)):
+    """
+    Remove as linhas cuja normalização contém caracteres inválidos ou que
+    ficaram com menos de 3 palavras, acumulando as contagens em counters.
 
-    return new_texts
+    As duas verificações são feitas de forma vetorizada sobre as colunas
+    normalizadas e combinadas em uma única máscara booleana; basta uma das
+    colunas falhar para a linha ser removida.
+    """
+    compromised_rows = False
+    short_rows = False
+    for column in columns:
+        normalized = df[column]
+        compromised_rows = compromised_rows | normalized.str.contains(INVALID_CHARACTER_PATTERN)
+        short_rows = short_rows | (normalized.str.count(' ') < 2)
+    few_words = ~compromised_rows & short_rows
+
+    counters['compromised_rows'] += int(compromised_rows.sum())
+    counters['few_words'] += int(few_words.sum())
+
+    return df[~(compromised_rows | few_words)]
+
+def column_mapping(args):
+    """
+    Associa cada coluna de transcrição à coluna normalizada correspondente.
+    Sem --output-columns, 'transcription-whisper' gera 'whisper_normalizado'
+    e as demais colunas ganham o sufixo '_normalizado'.
+    """
+    if args.output_columns is not None:
+        if len(args.output_columns) != len(args.columns):
+            raise ValueError("--output-columns deve ter o mesmo número de colunas que --columns")
+        return dict(zip(args.columns, args.output_columns))
+
+    return {
+        column: 'whisper_normalizado' if column == 'transcription-whisper' else f'{column}_normalizado'
+        for column in args.columns
+    }
+
+def input_columns(args):
+    """
+    Colunas a carregar do arquivo de entrada: todas, ou apenas as colunas de
+    transcrição e as colunas repassadas informadas em --keep-columns.
+    """
+    if args.keep_columns is None:
+        return None
+    return list(dict.fromkeys([*args.columns, *args.keep_columns]))
 
 def main():
    
     args = parse_arguments()
-    
-    punctuation_pattern = ['…', '...', '"', "'", ';', ',', ':', '.', '!', '?', ')', '(', '-', '–', '—', '"', '"', ''', ''', '´', '¨', '˜', '´', '´´', '`', '´´´', '´´´´', '´´´´´', '´´´´´´', '´´´´´´´', '´´´´´´´´', '´´´´´´´´´']
-    characters = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz" \
-             "\u00a1\u00a3\u00b7\u00b8\u00c0\u00c1\u00c2\u00c3\u00c4\u00c5\u00c7" \
-             "\u00c8\u00c9\u00ca\u00cb\u00cc\u00cd\u00ce\u00cf\u00d1\u00d2\u00d3" \
-             "\u00d4\u00d5\u00d6\u00d9\u00da\u00db\u00dc\u00df\u00e0\u00e1\u00e2" \
-             "\u00e3\u00e4\u00e5\u00e7\u00e8\u00e9\u00ea\u00eb\u00ec\u00ed\u00ee" \
-             "\u00ef\u00f1\u00f2\u00f3\u00f4\u00f5\u00f6\u00f9\u00fa\u00fb\u00fc" \
-             "\u0101\u0104\u0105\u0106\u0107\u010b\u0119\u0141\u0142\u0143\u0144" \
-             "\u0152\u0153\u015a\u015b\u0161\u0178\u0179\u017a\u017b\u017c\u020e" \
-             "\u04e7\u05c2\u1b20&+*§π€$²" 
-
-    character_list = [char for char in characters]
 
-    
+    input_format = args.format or detect_format(args.input)
+    output_format = args.output_format or args.format or detect_format(args.output)
+
     try:
-        df = pd.read_csv(args.input, sep="|", encoding="UTF-8")
+        chunks = read_chunks(args.input, input_format, args.chunksize, input_columns(args))
+        df = next(chunks)
         print(f"Colunas disponíveis: {df.columns.tolist()}")
     except Exception as e:
         print(f"Erro ao ler o arquivo de entrada: {e}")
         return
 
     
-    if 'transcription-whisper' not in df.columns:
-        print("Erro: Coluna 'transcription-whisper' não encontrada no arquivo CSV.")
+    try:
+        columns = column_mapping(args)
+    except ValueError as e:
+        print(f"Erro: {e}")
         return
 
-    texts = df["transcription-whisper"].tolist()
-
-    counter = 0
-    for idx, text in tqdm(enumerate(texts), total=len(texts), desc="Verificando arquivos .wav"):
-        if ".wav" in text:
-            print(f"idx: {idx} | text: {text}")
-            counter += 1
-            break
-    print(f"Counter: {counter}")
+    for column in columns:
+        if column not in df.columns:
+            print(f"Erro: Coluna '{column}' não encontrada no arquivo de entrada.")
+            return
 
-    # Normalizar sentenças
-    whisper_normalized = get_words(texts)
-    df['whisper_normalizado'] = whisper_normalized
+    try:
+        output_dir = os.path.dirname(args.output)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        writer = TableWriter(args.output, output_format, read_schema(args.input, input_format, input_columns(args)))
+        quarantine = TableWriter(args.quarantine or args.output + '.quarantine.jsonl', 'jsonl')
+    except Exception as e:
+        print(f"Erro ao salvar o arquivo de saída: {e}")
+        return
 
-    if len(whisper_normalized) != len(texts):
-        print("Erro: Inconsistência no comprimento dos dados normalizados.")
+    try:
+        load_rule_plugins(args.rules)
+        for issue in validate_rules() if args.rules else []:
+            print(issue)
+    except Exception as e:
+        print(f"Erro ao carregar os plugins de regras: {e}")
+        writer.close()
         return
 
-    compromised_rows = []
-    for idx, row in tqdm(enumerate(whisper_normalized), total=len(whisper_normalized), desc="Verificando caracteres inválidos"):
-        for word in row.split(' '):
-            for letter in word:
-                if letter not in character_list and letter not in punctuation_pattern:
-                    compromised_rows.append(idx)
-    print(f"Linhas comprometidas: {len(list(set(compromised_rows)))}")
+    profiling = args.profile is not None
+    init_worker(profiling, args.digit_threshold)
+    # O limite de dígitos e os plugins mudam o resultado, então fazem parte da versão do cache
+    version = f'{rules_version()}:{DIGIT_THRESHOLD}:{plugins_version(LOADED_RULE_PLUGINS)}'
 
-    df_cleaned = df.drop(index=list(set(compromised_rows)))
+    try:
+        checkpoint = open_checkpoint(args, input_format, output_format, version, writer, quarantine)
+    except (OSError, ValueError) as e:
+        print(f"Erro ao retomar a execução: {e}")
+        writer.close()
+        return
+    if checkpoint is not None and checkpoint.chunks:
+        for _ in range(checkpoint.chunks):
+            df = next(chunks, None)
+        print(f"Retomando após {checkpoint.chunks} blocos já gravados")
+
+    pool = Pool(args.workers, initializer=init_worker,
+                initargs=(profiling, args.digit_threshold, args.rules)) if args.workers > 1 else None
+    cache = NormalizationCache(args.cache, version) if args.cache else None
+    try:
+        process_chunks(args, df, chunks, pool, cache, writer, columns, checkpoint, quarantine)
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if cache is not None:
+            print(f"Cache: {cache.hits} linhas reaproveitadas, {cache.misses} normalizadas")
+            cache.close()
+        if checkpoint is not None and os.path.exists(checkpoint.path):
+            print(f"Execução interrompida com {checkpoint.chunks} blocos gravados; "
+                  f"use --resume para continuar a partir do bloco seguinte")
+        if profiling:
+            write_profile(args.profile)
+
+def checkpoint_settings(args, input_format, output_format):
+    """
+    Parâmetros que determinam a divisão em blocos e o conteúdo da saída; uma
+    execução só pode ser retomada com os mesmos valores.
+    """
+    return {
+        'input': os.path.abspath(args.input),
+        'input_size': os.path.getsize(args.input),
+        'format': input_format,
+        'output_format': output_format,
+        'chunksize': args.chunksize,
+        'columns': column_mapping(args),
+        'keep_columns': args.keep_columns,
+    }
+
+def open_checkpoint(args, input_format, output_format, version, writer, quarantine) -> Optional[Checkpoint]:
+    """
+    Prepara o manifesto de progresso da execução. Com --resume, carrega o
+    manifesto existente, confere os parâmetros e posiciona a saída e a
+    quarentena no fim do último bloco registrado; sem ele, descarta um
+    manifesto e uma quarentena antigos.
+    """
+    path = manifest_path(args.output)
+    if not args.resume and os.path.exists(quarantine.path):
+        os.remove(quarantine.path)
+    if output_format not in RESUMABLE_FORMATS:
+        if args.resume:
+            raise ValueError("--resume só é suportado para saídas CSV e JSONL")
+        return None
+
+    settings = checkpoint_settings(args, input_format, output_format)
+    if not args.resume:
+        checkpoint = Checkpoint(path, settings, version)
+        checkpoint.remove()
+        return checkpoint
+
+    if not os.path.exists(path):
+        raise ValueError(f"nenhum checkpoint encontrado em {path}")
+    checkpoint = Checkpoint.load(path)
+    mismatches = checkpoint.mismatches(settings)
+    if mismatches:
+        raise ValueError(f"parâmetros diferentes da execução interrompida: {', '.join(mismatches)}")
+    if checkpoint.version != version:
+        print("AVISO: as regras mudaram desde a execução interrompida; "
+              "os blocos já gravados mantêm o resultado das regras anteriores")
+        checkpoint.version = version
+
+    writer.resume(checkpoint.output_size)
+    # Descarta também as linhas de quarentena do bloco interrompido, mesmo
+    # que nenhum bloco concluído tenha tido erros
+    if os.path.exists(quarantine.path):
+        quarantine.resume(checkpoint.quarantine_size)
+    STATS.merge(checkpoint.stats)
+    return checkpoint
+
+def write_profile(path):
+    """
+    Grava o relatório de profiling em JSON no arquivo informado ou na saída padrão.
+    """
+    report = STATS.to_json()
+    if path == '-':
+        print(report)
+        return
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(report + '\n')
+    print(f"Relatório de profiling salvo em: {path}")
 
-    few_words = []
-    for idx, row in tqdm(enumerate(df_cleaned["whisper_normalizado"]), total=len(df_cleaned), desc="Verificando quantidade de palavras"):
-        if len(row.split(' ')) < 3:
-            few_words.append(idx)
-    print(f"Linhas com poucas palavras: {len(list(set(few_words)))}")
+def quarantine_rows(df, columns, errors, quarantine) -> List[int]:
+    """
+    Grava na quarentena as linhas do bloco em que a normalização de alguma
+    coluna falhou, uma entrada por falha, com a coluna, a etapa e o erro, e
+    devolve as posições dessas linhas no bloco.
+    """
+    positions = sorted(errors)
+    names = list(columns)
+    failed = df.iloc[[position % len(df) for position in positions]].copy()
+    failed['coluna'] = [names[position // len(df)] for position in positions]
+    failed['etapa'] = [errors[position].stage for position in positions]
+    failed['erro'] = [errors[position].error for position in positions]
+    quarantine.write(failed)
+    return sorted({position % len(df) for position in positions})
+
+def process_chunks(args, df, chunks, pool, cache, writer, columns, checkpoint=None, quarantine=None):
+    """
+    Normaliza, filtra e grava cada bloco lido do arquivo de entrada.
 
+    Os textos de todas as colunas de transcrição são normalizados juntos, em
+    uma única chamada, compartilhando o pool e os caches entre as colunas.
+    Com um checkpoint, cada bloco gravado é registrado no manifesto, que é
+    removido quando a execução termina.
 
-    df_cleaned = df_cleaned.drop(index=list(set(few_words)), errors='ignore')
+    Com uma quarentena, uma linha cuja normalização falha é gravada nela e
+    removida da saída, sem interromper as demais.
+    """
+    from tqdm import tqdm
+
+    counters = {'counter': 0, 'compromised_rows': 0, 'few_words': 0, 'quarantined_rows': 0}
+    if checkpoint is not None:
+        counters.update(checkpoint.counters)
+    counter = counters.pop('counter')
+    while df is not None:
+        texts = [text for column in columns for text in df[column].tolist()]
+
+        if not counter:
+            for idx, text in tqdm(enumerate(texts), total=len(texts), desc="Verificando arquivos .wav"):
+                if isinstance(text, str) and ".wav" in text:
+                    print(f"idx: {df.index[idx % len(df)]} | text: {text}")
+                    counter += 1
+                    break
+
+        # Normalizar sentenças
+        errors = {} if quarantine is not None else None
+        normalized = get_words(texts, pool, cache=cache, errors=errors)
+
+        if len(normalized) != len(texts):
+            print("Erro: Inconsistência no comprimento dos dados normalizados.")
+            return
+
+        failed = quarantine_rows(df, columns, errors, quarantine) if errors else []
+
+        for position, output_column in enumerate(columns.values()):
+            df[output_column] = normalized[position * len(df):(position + 1) * len(df)]
+        if failed:
+            counters['quarantined_rows'] += len(failed)
+            df = df.iloc[sorted(set(range(len(df))) - set(failed))]
+        df_cleaned = remove_invalid_rows(df, counters, list(columns.values()))
+
+        try:
+            writer.write(df_cleaned)
+        except Exception as e:
+            print(f"Erro ao salvar o arquivo de saída: {e}")
+            return
+        if checkpoint is not None:
+            checkpoint.commit(args.output, dict(counters, counter=counter), STATS.snapshot(),
+                              quarantine.path if quarantine is not None else None)
+
+        df = next(chunks, None)
+
+    if checkpoint is not None:
+        checkpoint.remove()
 
-    try:
-        output_dir = os.path.dirname(args.output)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-        df_cleaned.to_csv(args.output, sep="|", index=False)
-        print(f"Arquivo normalizado salvo em: {args.output}")
-    except Exception as e:
-        print(f"Erro ao salvar o arquivo de saída: {e}")
+    print(f"Counter: {counter}")
+    print(f"Linhas comprometidas: {counters['compromised_rows']}")
+    print(f"Linhas com poucas palavras: {counters['few_words']}")
+    if counters['quarantined_rows']:
+        print(f"Linhas com erro na normalização: {counters['quarantined_rows']} (gravadas em {quarantine.path})")
+    print(f"Textos repetidos reaproveitados: {reuse_ratio():.1%} "
+          f"({STATS.counters['unique_texts']} únicos de {STATS.counters['texts']})")
+    if STATS.counters['numbers.skipped']:
+        print(f"Números grandes demais mantidos sem conversão: {STATS.counters['numbers.skipped']}")
+    print(f"Arquivo normalizado salvo em: {args.output}")
 
 if __name__ == "__main__":
     main()
-
- 
\ No newline at end of file
@@ -1,4 +1,5 @@
-from math import ceil, floor
+from functools import lru_cache
+import re
 
 class Palavra:
 
@@ -6,100 +7,150 @@ class Palavra:
         self.singular = singular
         self.plural = plural
 
+# Dicionários para armazenar os números por extenso
+UNIDADES = {1: 'um', 2: 'dois', 3: 'três', 4: 'quatro', 5: 'cinco', 6: 'seis', 7: 'sete', 8: 'oito', 9: 'nove', 10 : 'dez',
+            11 : 'onze', 12 : 'doze', 13 : 'treze', 14 : 'quatorze', 15 : 'quinze', 16 : 'dezesseis', 17 : 'dezessete', 18 : 'dezoito', 19 : 'dezenove'}
+
+DEZENAS = {2: 'vinte', 3: 'trinta', 4: 'quarenta', 5: 'cinquenta', 6: 'sessenta', 7: 'setenta', 8: 'oitenta', 9: 'noventa'}
+
+CENTENAS = {1: Palavra('cem', 'cento'), 2: 'duzentos', 3: 'trezentos', 4: 'quatrocentos', 5: 'quinhentos', 6: 'seiscentos', 7: 'setecentos', 8: 'oitocentos', 9: 'novecentos'}
+
+# Tupla armazenando os milhares
+MILHARES = (Palavra('',''), Palavra('mil','mil'), Palavra('milhão','milhões'), \
+            Palavra('bilhão','bilhões'), Palavra('trilhão','trilhões'), Palavra('quatrilhão','quatrilhões'), \
+            Palavra('quintilhão','quintilhões'), Palavra('sextilhão','sextilhões'), Palavra('septilhão','septilhões'), \
+            Palavra('octilhão','octilhões'),Palavra('nonilhão','nonilhões'), Palavra('decilhão','decilhões'), \
+            Palavra('undecilhão','undecilhões'), Palavra('duodecilhão','duodecilhões'),Palavra('tredecilhão','tredecilhões'))
+
+NUMERO_MAXIMO = 999999999999999999999999999999999999999999999
+
+# Nomes dos dígitos, para a leitura dígito a dígito
+DIGITOS = ('zero', 'um', 'dois', 'três', 'quatro', 'cinco', 'seis', 'sete', 'oito', 'nove')
+
+
+def _escrever_grupo(parte_numero):
+    """
+    Escreve por extenso um grupo de três dígitos (0 a 999), sem milhar.
+    """
+    centena, resto = divmod(parte_numero, 100)
+    dezena, unidade = divmod(resto, 10)
+    palavras = []
+
+    # Caso a centena esteja preenchida, faz o tratamento
+    if centena > 0:
+        if centena == 1: # Se for CEM deve busca do singular, caso a unidade ou dezena esteja preenchida, busca do plural
+            palavras.append(CENTENAS[1].plural if resto else CENTENAS[1].singular)
+        else:
+            palavras.append(CENTENAS[centena])
+
+    # Se a dezena for um, busca das unidades
+    if dezena == 1:
+        palavras.append(UNIDADES[resto])
+    else:
+        if dezena > 1:
+            palavras.append(DEZENAS[dezena])
+        if unidade > 0:
+            palavras.append(UNIDADES[unidade])
+
+    return ' e '.join(palavras)
+
+
+# "um mil, duzentos..." vira "mil duzentos...", mas só quando o "um" é o grupo
+# inteiro dos milhares: em "vinte e um mil, duzentos..." ele faz parte do número
+UM_MIL_PATTERN = re.compile(r'(?:^|(?<=ão e )|(?<=ões e ))um mil,')
+
+# Tabela com o extenso de todos os grupos de 0 a 999
+GRUPOS = tuple(_escrever_grupo(n) for n in range(1000))
+
+# Conector usado antes de um grupo quando o extenso já está preenchido:
+# centenas "quebradas" (ex.: 1.250) usam vírgula, as demais usam "e"
+CONECTORES = tuple(', ' if n >= 100 and n % 100 else ' e ' for n in range(1000))
+
+
+@lru_cache(maxsize=65536)
+def escrever(numero):
+    """
+    Escreve o número inteiro por extenso, consultando a tabela de grupos.
+
+    O resultado é memorizado, já que as transcrições repetem muito os mesmos
+    números (anos, horas, porcentagens).
+    """
+    if (numero > NUMERO_MAXIMO):
+        raise Exception('Número informado maior que o número máximo suportado')
+    if (numero == 0):
+        return 'zero'
+    if (numero < 0):
+        return 'menos ' + escrever(-numero)
+
+    # Separa o número em grupos de três dígitos, do mais significativo ao menos
+    grupos = []
+    while numero:
+        numero, parte_numero = divmod(numero, 1000)
+        grupos.append(parte_numero)
+    grupos.reverse()
+
+    ternarios = len(grupos)
+    # Busca o tamanho do número informado
+    tamanho = (ternarios - 1) * 3 + len(str(grupos[0]))
+
+    partes = []
+    for n, parte_numero in enumerate(grupos, start=1):
+        # Caso o grupo seja zero, não precisa de tratamento
+        if parte_numero == 0:
+            continue
+
+        if partes:
+            partes.append(CONECTORES[parte_numero])
+        partes.append(GRUPOS[parte_numero])
+
+        # Tratamento para milhares
+        if n < tamanho: # Se não for o último, concatena o milhar correspondente
+            milhar = MILHARES[ternarios - n]
+            partes.append(' ' + (milhar.plural if parte_numero > 1 else milhar.singular))
+
+    return UM_MIL_PATTERN.sub('mil', ''.join(partes))
+
+
+def escrever_digitos(digitos):
+    """
+    Lê uma sequência de dígitos um a um (ex.: '0800' para 'zero oito zero
+    zero'), como se lê um telefone ou um documento.
+    """
+    return ' '.join(DIGITOS[int(digito)] for digito in digitos)
+
+
+def escrever_decimais(digitos):
+    """
+    Lê a parte decimal de um número mantendo os zeros à esquerda, que mudam
+    o valor (ex.: '05' para 'zero cinco' e '001' para 'zero zero um').
+    """
+    significativos = digitos.lstrip('0')
+    palavras = ['zero'] * (len(digitos) - len(significativos))
+    if significativos:
+        palavras.append(escrever(int(significativos)).strip())
+    return ' '.join(palavras)
+
+
 class Extenso:
 
     def __init__(self):
 
-        self._numero_maximo = 999999999999999999999999999999999999999999999
+        self._numero_maximo = NUMERO_MAXIMO
 
-        # Dicionários para armazenar os números por extenso
-        self.unidades = {1: 'um', 2: 'dois', 3: 'três', 4: 'quatro', 5: 'cinco', 6: 'seis', 7: 'sete', 8: 'oito', 9: 'nove', 10 : 'dez', 
-                         11 : 'onze', 12 : 'doze', 13 : 'treze', 14 : 'quatorze', 15 : 'quinze', 16 : 'dezesseis', 17 : 'dezessete', 18 : 'dezoito', 19 : 'dezenove'}
+        self.unidades = UNIDADES
+        self.dezenas = DEZENAS
+        self.centenas = CENTENAS
+        self.milhares = MILHARES
 
-        self.dezenas = {2: 'vinte', 3: 'trinta', 4: 'quarenta', 5: 'cinquenta', 6: 'sessenta', 7: 'setenta', 8: 'oitenta', 9: 'noventa'}
+    def escrever(self, numero):
+        return escrever(numero)
 
-        self.centenas = {1: Palavra('cem', 'cento'), 2: 'duzentos', 3: 'trezentos', 4: 'quatrocentos', 5: 'quinhentos', 6: 'seiscentos', 7: 'setecentos', 8: 'oitocentos', 9: 'novecentos'}
+    def escrever_digitos(self, digitos):
+        return escrever_digitos(digitos)
 
-        # Tupla armazenando os milhares
-        self.milhares = (Palavra('',''), Palavra('mil','mil'), Palavra('milhão','milhões'), \
-                        Palavra('bilhão','bilhões'), Palavra('trilhão','trilhões'), Palavra('quatrilhão','quatrilhões'), \
-                        Palavra('quintilhão','quintilhões'), Palavra('sextilhão','sextilhões'), Palavra('septilhão','septilhões'), \
-                        Palavra('octilhão','octilhões'),Palavra('nonilhão','nonilhões'), Palavra('decilhão','decilhões'), \
-                        Palavra('undecilhão','undecilhões'), Palavra('duodecilhão','duodecilhões'),Palavra('tredecilhão','tredecilhões'))
+    def escrever_decimais(self, digitos):
+        return escrever_decimais(digitos)
 
 
-    def escrever(self, numero):
-        if (numero > self._numero_maximo):
-            raise Exception('Número informado maior que o número máximo suportado')
-        if (numero == 0):
-            return 'zero'
-        extenso = ''
-
-        # Conversão do número recebido para string
-        numero_string = str(numero)
-        # Busca o tamanho do número informado
-        tamanho = len(numero_string)
-
-        # Arredonda para cima para saber quantos grupos de três há
-        ternarios = ceil(tamanho / 3)
-
-        # Preenche a string do número com zeros até o tamanho divisível por 3
-        numero_string = numero_string.zfill(ternarios * 3)
-
-        # percorre os grupos de três números
-        for n in range(1, ternarios + 1):
-            # Busca a parte do número referente ao grupo atual
-            parte_numero = int(numero_string[(n - 1) * 3 : n * 3])
-
-            # Caso o grupo seja zero, não precisa de tratamento
-            if parte_numero == 0:
-                continue
-
-            # Cálculo para retornar a centena
-            centena = floor(parte_numero / 100)
-
-            # Cálculo para retornar a dezena
-            dezena = floor((parte_numero - (centena*100)) / 10)
-
-            # Cálculo para retornar a unidade
-            unidade = parte_numero - (centena*100) - (dezena*10)
-
-            # Caso a centena esteja preenchida, faz o tratamento
-            if (centena > 0):
-                if (dezena == 0 and unidade == 0 and extenso != ''):
-                    extenso += ' e '
-                elif extenso != '':
-                    extenso += ', '
-                if (centena == 1): # Se for CEM deve busca do singular, caso a unidade ou dezena esteja preenchida, busca do plural
-                    if(dezena > 0 or unidade > 0):
-                        extenso += self.centenas[centena].plural
-                    else:
-                        extenso += self.centenas[centena].singular
-                else:
-                    extenso += self.centenas[centena] # Caso a centena for maior que 1, busca a string correspondente no dicionário
-
-            # Caso a dezena esteja preenchida, faz o tratamento
-            if (dezena > 0):
-                if (extenso != ''): # Se o número por extenso já veio preenchido, adiciona "E"
-                    extenso += ' e '
-
-                if (dezena == 1): # Se a dezena for um, busca das unidades
-                    dezena = 10 + unidade
-                    unidade = 0 # para não executar o extenso das unidades
-                    extenso += self.unidades[dezena] # Busca o extenso correspondente nas unidades
-                else:
-                    extenso += self.dezenas[dezena] # Se a dezena for maior que um, busca da sua posição correspondente nas dezenas
-
-            # Caso a unidade esteja preenchida, faz o tratamento
-            if (unidade > 0):
-                if (extenso != ''): # Se a centena ou dezena estão preenchidas, adiciona "E"
-                    extenso += ' e '
-                extenso += self.unidades[unidade] # Busca o extenso correspondente nas unidades
-
-            # Tratamento para milhares
-            if n < tamanho: # Se não for o último, concatena o milhar correspondente
-                if (parte_numero > 1):
-                    extenso += f' {self.milhares[ternarios - n].plural}' # Maior que 1, busca o plural
-                else:
-                    extenso += f' {self.milhares[ternarios - n].singular}' # Se for 1, busca o singular
-        return extenso.replace('um mil,', 'mil')
\ No newline at end of file
+# Instância compartilhada, para não recriar o conversor a cada chamada
+EXTENSO = Extenso()
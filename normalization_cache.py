@@ -0,0 +1,94 @@
+"""
+Cache persistente da normalização, guardado em um arquivo SQLite.
+
+Cada entrada é indexada pelo hash do texto original e pela versão das regras.
+A versão é o hash do código-fonte dos módulos que definem as regras (Switcher,
+tabelas de unidades, Extenso, registro de regras etc.), de forma que qualquer
+alteração neles invalida as entradas antigas na próxima abertura do cache.
+"""
+import hashlib
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Módulos cujas regras determinam o resultado da normalização
+RULE_FILES = ('convert_special_cases.py', 'normalizar_numeros.py', 'normalizar_coluna.py', 'rule_registry.py')
+
+# Limite de parâmetros por consulta, abaixo do máximo padrão do SQLite
+QUERY_BATCH_SIZE = 500
+
+
+def rules_version() -> str:
+    """
+    Calcula a versão das regras a partir do conteúdo dos módulos de normalização.
+    """
+    digest = hashlib.sha256()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in RULE_FILES:
+        with open(os.path.join(base_dir, name), 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class NormalizationCache:
+    """
+    Armazena textos normalizados em SQLite, indexados por hash do texto e
+    versão das regras.
+    """
+
+    def __init__(self, path: str, version: Optional[str] = None):
+        self.path = path
+        self.version = version or rules_version()
+        self.hits = 0
+        self.misses = 0
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS normalized ('
+            'hash BLOB NOT NULL, version TEXT NOT NULL, text TEXT NOT NULL, '
+            'PRIMARY KEY (hash, version))'
+        )
+        # Entradas geradas por outra versão das regras não são mais válidas
+        self.connection.execute('DELETE FROM normalized WHERE version != ?', (self.version,))
+        self.connection.commit()
+
+    def get_many(self, texts: List[str]) -> List[Optional[str]]:
+        """
+        Busca os textos no cache e devolve, na mesma ordem, o texto
+        normalizado ou None para os que ainda não foram normalizados.
+        """
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[bytes, str] = {}
+        unique_hashes = list(dict.fromkeys(hashes))
+        for start in range(0, len(unique_hashes), QUERY_BATCH_SIZE):
+            batch = unique_hashes[start:start + QUERY_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.connection.execute(
+                f'SELECT hash, text FROM normalized WHERE version = ? AND hash IN ({placeholders})',
+                [self.version, *batch],
+            )
+            found.update(rows)
+
+        results = [found.get(key) for key in hashes]
+        hits = sum(result is not None for result in results)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put_many(self, items: Iterable[Tuple[str, str]]):
+        """
+        Grava pares (texto original, texto normalizado) no cache.
+        """
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO normalized (hash, version, text) VALUES (?, ?, ?)',
+            ((text_hash(text), self.version, normalized) for text, normalized in items),
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
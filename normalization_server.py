@@ -0,0 +1,284 @@
+"""
+Servidor de normalização para uso online, por exemplo pelos workers de
+inferência de ASR.
+
+O servidor fica em execução com as regras compiladas, as tabelas do Extenso e
+os caches já carregados, recebendo lotes de textos por HTTP (em uma porta TCP
+ou em um socket Unix). A normalização roda em um pool de processos, sem
+bloquear o loop do asyncio.
+
+Uso:
+    python normalization_server.py --port 8765 --workers 4
+    python normalization_server.py --unix /tmp/normalizacao.sock
+
+Endpoints:
+    POST /normalize  {"texts": ["..."]}  ->  {"normalized": ["..."]}
+    GET  /health                         ->  {"status": "ok"}
+    GET  /stats                          ->  relatório de pipeline_stats
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import normalizar_coluna
+from normalizar_coluna import batched, normalize_chunk, treat_specific_cases
+from pipeline_stats import STATS, enable_profiling
+
+
+# Tamanho máximo do corpo de uma requisição
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def init_worker(profiling, digit_threshold, rule_plugins=()):
+    """
+    Inicializa cada worker do pool, já com as regras carregadas e os caches
+    de números aquecidos.
+    """
+    normalizar_coluna.init_worker(profiling, digit_threshold, rule_plugins)
+    treat_specific_cases('1 2,5 10%')
+    STATS.reset()
+
+
+class NormalizationServer:
+    """
+    Recebe lotes de textos por HTTP e os normaliza em um pool de processos.
+
+    Cada lote é dividido em sub-lotes de batch_size textos, enviados aos
+    workers em paralelo; textos repetidos no mesmo lote são normalizados
+    uma única vez.
+    """
+
+    def __init__(self, workers: int = 1, batch_size: int = 64, profiling: bool = False,
+                 digit_threshold: Optional[int] = normalizar_coluna.DIGIT_THRESHOLD,
+                 rule_plugins: List[str] = ()):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.profiling = profiling
+        self.digit_threshold = digit_threshold
+        self.rule_plugins = list(rule_plugins)
+        self.executor = None
+        self.server = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765, unix: Optional[str] = None):
+        enable_profiling(self.profiling)
+        normalizar_coluna.load_rule_plugins(self.rule_plugins)
+        self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                            initargs=(self.profiling, self.digit_threshold, self.rule_plugins))
+
+        # Sobe os workers antes de aceitar conexões, para que a primeira
+        # requisição não pague a inicialização do pool
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, os.getpid)
+                               for _ in range(self.workers)))
+
+        if unix is not None:
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=unix)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    async def normalize(self, texts: List[str]) -> List[str]:
+        """
+        Normaliza os textos no pool de processos, mantendo a ordem.
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        STATS.count('texts', len(texts))
+        STATS.count('unique_texts', len(unique_texts))
+
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(loop.run_in_executor(self.executor, normalize_chunk, batch)
+                                         for batch in batched(unique_texts, self.batch_size)))
+
+        normalized = {}
+        for batch, (batch_normalized, snapshot) in zip(batched(unique_texts, self.batch_size), results):
+            STATS.merge(snapshot)
+            normalized.update(zip(batch, batch_normalized))
+        return [normalized[text] for text in texts]
+
+    async def route(self, method: str, path: str, body: bytes):
+        if path == '/health':
+            return {'status': 'ok'}
+        if path == '/stats':
+            return STATS.report()
+        if path != '/normalize':
+            raise HTTPError(404, f"Caminho não encontrado: {path}")
+        if method != 'POST':
+            raise HTTPError(405, "Use POST para /normalize")
+
+        try:
+            texts = json.loads(body)['texts']
+        except (ValueError, KeyError, TypeError):
+            raise HTTPError(400, 'O corpo deve ser um JSON no formato {"texts": [...]}')
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise HTTPError(400, "'texts' deve ser uma lista de strings")
+
+        STATS.count('server.requests')
+        return {'normalized': await self.normalize(texts)}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Atende as requisições de uma conexão, mantendo-a aberta entre elas
+        (keep-alive), até o cliente encerrar.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    method, path, _ = request_line.decode('latin-1').split()
+                    length = int(headers.get('content-length', 0))
+                    if length > MAX_BODY_SIZE:
+                        keep_alive = False
+                        raise HTTPError(413, "Requisição maior que o limite suportado")
+                    body = await reader.readexactly(length)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': e.message}
+                except ValueError:
+                    status, payload, keep_alive = 400, {'error': 'Requisição HTTP inválida'}, False
+                except asyncio.IncompleteReadError:
+                    break
+                else:
+                    # Fora da leitura da requisição, um ValueError é uma falha da
+                    # normalização (500), e não uma requisição malformada: a
+                    # conexão continua aberta
+                    try:
+                        status, payload = 200, await self.route(method, path, body)
+                    except HTTPError as e:
+                        status, payload = e.status, {'error': e.message}
+                    except Exception as e:
+                        status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+
+                content = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__('localhost', timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class NormalizationClient:
+    """
+    Cliente síncrono do servidor, que reaproveita a mesma conexão entre
+    as chamadas.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, unix: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        if unix is not None:
+            self.connection = UnixHTTPConnection(unix, timeout=timeout)
+        else:
+            self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def request(self, method: str, path: str, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        self.connection.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+        response = self.connection.getresponse()
+        result = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"Erro {response.status}: {result.get('error')}")
+        return result
+
+    def normalize(self, texts: List[str]) -> List[str]:
+        return self.request('POST', '/normalize', {'texts': texts})['normalized']
+
+    def stats(self):
+        return self.request('GET', '/stats')
+
+    def close(self):
+        self.connection.close()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Long-running normalization server (HTTP over TCP or a Unix socket)')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                      help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', '-p', type=int, default=8765,
+                      help='TCP port to listen on (default: 8765)')
+    parser.add_argument('--unix', type=str, default=None,
+                      help='Listen on this Unix socket path instead of TCP')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1,
+                      help='Number of worker processes (default: number of CPUs)')
+    parser.add_argument('--batch-size', type=int, default=64,
+                      help='Texts per task sent to a worker (default: 64)')
+    parser.add_argument('--digit-threshold', type=int, default=normalizar_coluna.DIGIT_THRESHOLD,
+                      help='Digit strings longer than this are read digit by digit; 0 reads them as numbers '
+                           f'(default: {normalizar_coluna.DIGIT_THRESHOLD})')
+    parser.add_argument('--rules', type=str, nargs='+', default=[],
+                      help='Rule plugin files (Python or YAML) with extra Switcher rules and units')
+    parser.add_argument('--profile', action='store_true',
+                      help='Record per-stage timings, exposed at GET /stats')
+    return parser.parse_args()
+
+
+async def serve(args):
+    server = NormalizationServer(args.workers, args.batch_size, args.profile, args.digit_threshold, args.rules)
+    await server.start(args.host, args.port, args.unix)
+    print(f"Servidor de normalização ouvindo em {args.unix or f'http://{args.host}:{args.port}'}")
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    args = parse_arguments()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Contadores e tempos por etapa do pipeline de normalização.
+
+Os contadores ficam sempre ativos. A medição de chamadas e tempo por etapa só
+acontece quando o profiling está habilitado (--profile), para não pesar na
+execução normal.
+"""
+import json
+import time
+from collections import Counter
+
+
+class PipelineStats:
+    """
+    Acumula contadores e, com profiling habilitado, o número de chamadas e o
+    tempo total de cada etapa.
+    """
+
+    def __init__(self):
+        self.profiling = False
+        self.counters = Counter()
+        self.calls = Counter()
+        self.seconds = Counter()
+
+    def timed(self, stage, function, *args):
+        """
+        Executa function(*args), contabilizando a chamada em stage quando o
+        profiling está habilitado.
+        """
+        if not self.profiling:
+            return function(*args)
+
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.calls[stage] += 1
+            self.seconds[stage] += time.perf_counter() - start
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def snapshot(self):
+        return {'counters': dict(self.counters), 'calls': dict(self.calls), 'seconds': dict(self.seconds)}
+
+    def pop_snapshot(self):
+        """
+        Devolve o estado atual e zera os acumuladores; usado pelos workers
+        para enviar ao processo principal apenas o que mediram em cada lote.
+        """
+        snapshot = self.snapshot()
+        self.reset()
+        return snapshot
+
+    def merge(self, snapshot):
+        self.counters.update(snapshot['counters'])
+        self.calls.update(snapshot['calls'])
+        self.seconds.update(snapshot['seconds'])
+
+    def reset(self):
+        self.counters.clear()
+        self.calls.clear()
+        self.seconds.clear()
+
+    def report(self):
+        """
+        Monta o relatório da execução, com as etapas ordenadas pelo tempo total.
+        """
+        stages = {
+            stage: {
+                'calls': self.calls[stage],
+                'seconds': round(self.seconds[stage], 6),
+                'mean_us': round(self.seconds[stage] / self.calls[stage] * 1e6, 3),
+            }
+            for stage in sorted(self.calls, key=self.seconds.__getitem__, reverse=True)
+        }
+        return {'stages': stages, 'counters': dict(sorted(self.counters.items()))}
+
+    def to_json(self):
+        return json.dumps(self.report(), ensure_ascii=False, indent=2)
+
+
+# Instância usada por todos os módulos do pipeline (uma por processo)
+STATS = PipelineStats()
+
+
+def failed_stage(error, default):
+    """
+    Etapa mais interna em execução quando error foi levantado, lida dos
+    quadros de timed no traceback; assim a execução normal não paga nada
+    para que a etapa de um erro seja conhecida.
+    """
+    stage = default
+    traceback = error.__traceback__
+    while traceback is not None:
+        if traceback.tb_frame.f_code is PipelineStats.timed.__code__:
+            stage = traceback.tb_frame.f_locals['stage']
+        traceback = traceback.tb_next
+    return stage
+
+
+def enable_profiling(enabled=True):
+    """
+    Habilita a medição por etapa; usada também como initializer dos workers.
+    """
+    STATS.profiling = enabled
@@ -0,0 +1,306 @@
+"""
+Tabela declarativa das regras do Switcher, com extensão por plugins.
+
+Cada regra tem um padrão, um conversor e uma prioridade. As regras são
+compiladas em uma única alternância ancorada, de forma que o custo de
+encontrar a regra de uma palavra não cresce com o número de regras.
+
+Novas regras e unidades podem ser carregadas de um arquivo Python (que
+define RULES e/ou UNITS) ou YAML:
+
+    rules:
+      - name: newtons
+        pattern: '(\\d+)N'
+        template: '{1:extenso} newtons'
+        priority: 550
+        examples: ['10N']
+    units:
+      km/l: quilômetros por litro
+
+Uso (valida as regras embutidas e as dos plugins informados):
+    python rule_registry.py plugin.yaml
+"""
+import hashlib
+import importlib
+import importlib.util
+import os
+import re
+import string
+import sys
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+
+def _has_group_reference(value) -> bool:
+    """
+    Procura referências a grupos (\\1, (?P=nome), (?(1)...)) na árvore de um
+    padrão já analisado por sre_parse.
+    """
+    if isinstance(value, tuple) and value and getattr(value[0], 'name', '').startswith('GROUPREF'):
+        return True
+    if isinstance(value, (tuple, list, sre_parse.SubPattern)):
+        return any(_has_group_reference(item) for item in value)
+    return False
+
+
+def pattern_problem(pattern: str, regex) -> Optional[str]:
+    """
+    Motivo pelo qual o padrão não pode entrar na alternância combinada do
+    RuleSet, ou None. Dentro dela os grupos da regra são renumerados, os
+    nomes de grupos podem colidir com os de outras regras e flags globais
+    como (?i) só são aceitas no início do padrão inteiro.
+    """
+    if regex.flags & ~re.UNICODE:
+        return "usa flags globais como (?i); use a forma com escopo, como (?i:...)"
+    if regex.groupindex:
+        return "usa grupos nomeados; use grupos numerados"
+    if _has_group_reference(sre_parse.parse(pattern)):
+        return "usa referências a grupos (\\1, (?P=nome) ou (?(1)...))"
+    return None
+
+
+class Rule:
+    """
+    Regra do Switcher: quando a palavra inteira casa com pattern, o
+    conversor recebe os grupos capturados.
+
+    O conversor pode ser o nome de um método conv_* do Switcher ou uma
+    função que recebe os grupos e devolve o texto convertido (ou None para
+    manter a palavra). Regras de maior prioridade são testadas primeiro;
+    examples são palavras que a regra deve converter, usadas na validação.
+    """
+
+    def __init__(self, name: str, pattern: str, converter: Union[str, Callable], priority: int = 0,
+                 examples: Iterable[str] = ()):
+        self.name = name
+        self.pattern = pattern
+        self.converter = converter
+        self.priority = priority
+        self.examples = tuple(examples)
+        try:
+            self.regex = re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Regra {name!r}: padrão inválido {pattern!r}: {e}")
+        problem = pattern_problem(pattern, self.regex)
+        if problem:
+            raise ValueError(f"Regra {name!r}: o padrão {pattern!r} {problem}")
+
+    def __repr__(self):
+        return f"Rule({self.name!r}, {self.pattern!r}, priority={self.priority})"
+
+
+class TemplateConverter:
+    """
+    Conversor descrito por um modelo de texto, para regras declaradas em
+    YAML: '{1}' insere o primeiro grupo e '{1:extenso}' o insere por extenso.
+    """
+
+    def __init__(self, template: str):
+        self.template = template
+        self.fields = [(literal, field, spec) for literal, field, spec, _ in string.Formatter().parse(template)]
+
+    def __call__(self, *groups):
+        from normalizar_numeros import EXTENSO
+
+        parts = []
+        for literal, field, spec in self.fields:
+            parts.append(literal)
+            if field is None:
+                continue
+            value = groups[int(field) - 1]
+            parts.append(EXTENSO.escrever(int(value)) if spec == 'extenso' else value)
+        return ''.join(parts)
+
+
+class RuleSet:
+    """
+    Conjunto ordenado de regras, compilado em um único padrão.
+
+    Os empates de prioridade são resolvidos pela ordem de registro.
+    """
+
+    def __init__(self, rules: Iterable[Rule] = ()):
+        self.rules: List[Rule] = []
+        self.pattern = None
+        self.dispatch: Dict[int, Tuple[Rule, int, int]] = {}
+        for rule in rules:
+            self.register(rule, compile=False)
+        self.compile()
+
+    def register(self, rule: Rule, compile: bool = True):
+        if any(existing.name == rule.name for existing in self.rules):
+            raise ValueError(f"Regra duplicada: {rule.name}")
+        self.rules.append(rule)
+        if compile:
+            self.compile()
+
+    def extend(self, rules: Iterable[Rule]):
+        for rule in rules:
+            self.register(rule, compile=False)
+        self.compile()
+
+    def ordered(self) -> List[Rule]:
+        return sorted(self.rules, key=lambda rule: -rule.priority)
+
+    def compile(self):
+        """
+        Junta as regras em uma única alternância ancorada, compilada uma só vez.
+
+        Cada regra fica envolvida em um grupo externo; como ele é o último grupo
+        a fechar, ``match.lastindex`` identifica a regra vencedora e os grupos
+        internos dela já saem capturados no mesmo ``match``.
+        """
+        alternatives = []
+        self.dispatch = {}
+        group_index = 1
+        for rule in self.ordered():
+            inner_groups = rule.regex.groups
+            alternatives.append(f'({rule.pattern})')
+            self.dispatch[group_index] = (rule, group_index + 1, group_index + 1 + inner_groups)
+            group_index += inner_groups + 1
+
+        self.pattern = re.compile('^(?:' + '|'.join(alternatives) + ')$')
+        # As palavras se repetem muito; o resultado é memorizado até a
+        # próxima recompilação, então palavras já vistas não pagam pelas regras
+        self.match = lru_cache(maxsize=65536)(self._match)
+
+    def _match(self, text: str) -> Optional[Tuple[Rule, tuple]]:
+        """
+        Devolve a regra que converte a palavra e os grupos capturados por ela.
+        """
+        match = self.pattern.match(text)
+        if not match:
+            return None
+        rule, first, last = self.dispatch[match.lastindex]
+        return rule, match.groups(default='')[first - 1:last - 1]
+
+    def validate(self) -> List[str]:
+        """
+        Confere os exemplos de cada regra contra todas as outras e descreve
+        os problemas encontrados:
+
+        - ERRO: o exemplo não casa com a própria regra, ou é capturado por uma
+          regra de maior prioridade (a regra fica encoberta);
+        - AVISO: o exemplo também casa com uma regra de menor prioridade
+          (sobreposição), ou a regra não tem exemplos para ser conferida.
+        """
+        issues = []
+        ordered = self.ordered()
+        for position, rule in enumerate(ordered):
+            if not rule.examples:
+                issues.append(f"AVISO: {rule.name}: sem exemplos, não foi possível conferir sobreposições")
+            for example in rule.examples:
+                if not rule.regex.fullmatch(example):
+                    issues.append(f"ERRO: {rule.name}: o exemplo {example!r} não casa com o padrão da regra")
+                    continue
+                winner = self.match(example)[0]
+                if winner is not rule:
+                    issues.append(f"ERRO: {rule.name}: o exemplo {example!r} é capturado antes por {winner.name}")
+                overlaps = [other.name for other in ordered[position + 1:] if other.regex.fullmatch(example)]
+                if overlaps:
+                    issues.append(f"AVISO: {rule.name}: o exemplo {example!r} também casa com {', '.join(overlaps)}")
+        return issues
+
+
+class RulePlugin:
+    """
+    Regras e unidades lidas de um arquivo de plugin.
+    """
+
+    def __init__(self, path: str, rules: Iterable[Rule] = (), units: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.rules = list(rules)
+        self.units = dict(units or {})
+
+
+def require_yaml():
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("Plugins em YAML requerem o pacote pyyaml (pip install pyyaml)")
+    return yaml
+
+
+def resolve_converter(reference: str) -> Callable:
+    """
+    Importa uma função a partir de 'modulo:funcao'.
+    """
+    module_name, _, function_name = reference.partition(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _load_yaml(path: str) -> RulePlugin:
+    yaml = require_yaml()
+    with open(path, encoding='utf-8') as file:
+        data = yaml.safe_load(file) or {}
+
+    rules = []
+    for entry in data.get('rules', []):
+        if 'template' in entry:
+            converter = TemplateConverter(entry['template'])
+        elif 'converter' in entry:
+            converter = entry['converter']
+            if ':' in converter:
+                converter = resolve_converter(converter)
+        else:
+            raise ValueError(f"Regra {entry.get('name')!r} em {path} sem 'template' ou 'converter'")
+        rules.append(Rule(entry['name'], entry['pattern'], converter,
+                          entry.get('priority', 0), entry.get('examples', ())))
+
+    return RulePlugin(path, rules, data.get('units'))
+
+
+def _load_python(path: str) -> RulePlugin:
+    name = 'rule_plugin_' + os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return RulePlugin(path, getattr(module, 'RULES', ()), getattr(module, 'UNITS', None))
+
+
+def load_plugin(path: str) -> RulePlugin:
+    """
+    Lê um plugin em Python (.py) ou YAML (.yaml/.yml).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.py':
+        return _load_python(path)
+    if extension in ('.yaml', '.yml'):
+        return _load_yaml(path)
+    raise ValueError(f"Formato de plugin não suportado: {path}")
+
+
+def plugins_version(paths: Iterable[str]) -> str:
+    """
+    Hash do conteúdo dos plugins, para compor a versão do cache.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def main():
+    from convert_special_cases import SWITCHER_RULES
+    from normalizar_coluna import load_rule_plugins, validate_rules
+
+    try:
+        load_rule_plugins(sys.argv[1:])
+    except ValueError as e:
+        print(f"ERRO: {e}")
+        sys.exit(1)
+    issues = validate_rules()
+    for issue in issues:
+        print(issue)
+    print(f"{len(SWITCHER_RULES.rules)} regras verificadas")
+    sys.exit(1 if any(issue.startswith('ERRO') for issue in issues) else 0)
+
+
+if __name__ == "__main__":
+    main()
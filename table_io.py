@@ -0,0 +1,242 @@
+"""
+Leitura e escrita em blocos das tabelas de transcrições.
+
+Formatos suportados: CSV com pipe (|) como delimitador, Parquet, Arrow (IPC/Feather)
+e JSONL. Parquet e Arrow dependem do pacote opcional pyarrow.
+"""
+import json
+import os
+from typing import Iterator, List, Optional
+
+
+FORMATS = ('csv', 'parquet', 'arrow', 'jsonl')
+
+EXTENSIONS = {
+    '.parquet': 'parquet', '.pq': 'parquet',
+    '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow',
+    '.jsonl': 'jsonl', '.ndjson': 'jsonl',
+}
+
+
+def detect_format(path: str) -> str:
+    """
+    Deduz o formato pela extensão do arquivo; na dúvida, assume CSV.
+    """
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Os formatos parquet e arrow requerem o pacote pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def read_chunks(path: str, fmt: str, chunksize: Optional[int] = None,
+                columns: Optional[List[str]] = None) -> Iterator:
+    """
+    Lê o arquivo em blocos de chunksize linhas (ou inteiro, sem chunksize),
+    carregando apenas as colunas informadas.
+    """
+    if fmt == 'csv':
+        return _read_csv(path, chunksize, columns)
+    if fmt == 'jsonl':
+        return _read_jsonl(path, chunksize, columns)
+    if fmt == 'parquet':
+        return _read_parquet(path, chunksize, columns)
+    if fmt == 'arrow':
+        return _read_arrow(path, chunksize, columns)
+    raise ValueError(f"Formato não suportado: {fmt}")
+
+
+def _read_csv(path, chunksize, columns):
+    import pandas as pd
+
+    # Todas as colunas são lidas como texto, para que as colunas repassadas
+    # saiam idênticas na execução completa e na execução em blocos
+    reader = pd.read_csv(path, sep="|", encoding="UTF-8", dtype=str, chunksize=chunksize, usecols=columns)
+    if chunksize is None:
+        return iter([reader])
+    return reader
+
+
+def _read_jsonl(path, chunksize, columns):
+    import pandas as pd
+
+    # Os valores são mantidos como objetos Python, sem inferência de tipos,
+    # pelo mesmo motivo da leitura do CSV como texto
+    def to_frame(records):
+        if columns is not None:
+            records = [{column: record.get(column) for column in columns} for record in records]
+        return pd.DataFrame(records, columns=columns, dtype=object)
+
+    with open(path, encoding='utf-8') as file:
+        records = []
+        for line in file:
+            if not line.strip():
+                continue
+            records.append(json.loads(line))
+            if chunksize is not None and len(records) == chunksize:
+                yield to_frame(records)
+                records = []
+        if records or chunksize is None:
+            yield to_frame(records)
+
+
+def _read_parquet(path, chunksize, columns):
+    require_pyarrow()
+    import pyarrow.parquet as pq
+
+    if chunksize is None:
+        yield pq.read_table(path, columns=columns).to_pandas()
+        return
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+
+def _read_arrow(path, chunksize, columns):
+    pa = require_pyarrow()
+    import pyarrow.ipc
+
+    # O arquivo é mapeado em memória, então ler a tabela não a copia
+    with pa.memory_map(path) as source:
+        table = pyarrow.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+
+        if chunksize is None:
+            yield table.to_pandas()
+            return
+
+        for batch in table.to_batches(max_chunksize=chunksize):
+            yield batch.to_pandas()
+
+
+def read_schema(path: str, fmt: str, columns: Optional[List[str]] = None):
+    """
+    Esquema das colunas de uma entrada Parquet ou Arrow, lido dos metadados
+    do arquivo; os demais formatos não têm esquema (None).
+    """
+    if fmt not in ('parquet', 'arrow'):
+        return None
+    pa = require_pyarrow()
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        schema = pq.read_schema(path)
+    else:
+        import pyarrow.ipc
+        with pa.memory_map(path) as source:
+            schema = pyarrow.ipc.open_file(source).schema
+    if columns is not None:
+        schema = pa.schema([schema.field(column) for column in columns if column in schema.names])
+    return schema
+
+
+def _json_value(value):
+    """
+    Valores ausentes (NaN, NaT, NA) viram null, como no to_json do pandas.
+    """
+    import pandas as pd
+
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    return value
+
+
+def _text_value(value):
+    """
+    Valor de uma coluna gravada como texto: valores que não são texto (um
+    número no JSONL, por exemplo) são gravados na sua forma JSON.
+    """
+    value = _json_value(value)
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class TableWriter:
+    """
+    Grava os blocos normalizados à medida que ficam prontos: linhas
+    acrescentadas no CSV e no JSONL, um row group por bloco no Parquet e um
+    record batch por bloco no Arrow.
+    """
+
+    def __init__(self, path: str, fmt: str, input_schema=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato não suportado: {fmt}")
+        if fmt in ('parquet', 'arrow'):
+            require_pyarrow()
+
+        self.path = path
+        self.fmt = fmt
+        self.input_schema = input_schema
+        self.schema = None
+        self._text_columns: List[str] = []
+        self._writer = None
+        self._started = False
+
+    def write(self, df):
+        if self.fmt == 'csv':
+            df.to_csv(self.path, sep="|", index=False, mode='a' if self._started else 'w', header=not self._started)
+        elif self.fmt == 'jsonl':
+            # Cada registro é gravado com json.dumps, que mantém os floats com
+            # todos os dígitos (o to_json do pandas os arredonda para 10 casas)
+            with open(self.path, 'a' if self._started else 'w', encoding='utf-8') as file:
+                for record in df.to_dict(orient='records'):
+                    file.write(json.dumps({key: _json_value(value) for key, value in record.items()},
+                                          ensure_ascii=False, separators=(',', ':'), default=str) + '\n')
+        else:
+            self._write_arrow_table(df)
+        self._started = True
+
+    def resume(self, size: int):
+        """
+        Continua uma saída CSV ou JSONL já iniciada, descartando o que foi
+        gravado depois dos primeiros size bytes.
+        """
+        if self.fmt not in ('csv', 'jsonl'):
+            raise ValueError(f"Não é possível continuar uma saída {self.fmt}")
+        os.truncate(self.path, size)
+        self._started = size > 0
+
+    def _write_arrow_table(self, df):
+        import pyarrow as pa
+
+        if self._writer is None:
+            self.schema = self._arrow_schema(pa.Table.from_pandas(df, preserve_index=False).schema)
+            if self.fmt == 'parquet':
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.path, self.schema)
+            else:
+                import pyarrow.ipc
+                self._writer = pyarrow.ipc.new_file(self.path, self.schema)
+
+        if self._text_columns:
+            df = df.assign(**{column: df[column].map(_text_value) for column in self._text_columns})
+        self._writer.write_table(pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+
+    def _arrow_schema(self, inferred):
+        """
+        O esquema do arquivo é fixado no primeiro bloco. As colunas repassadas
+        mantêm o tipo da entrada Parquet ou Arrow; sem esquema de entrada, uma
+        coluna toda nula no primeiro bloco (tipo null) é gravada como texto,
+        para que os valores dos blocos seguintes caibam nela.
+        """
+        import pyarrow as pa
+
+        fields = []
+        for field in inferred:
+            if self.input_schema is not None and field.name in self.input_schema.names:
+                field = field.with_type(self.input_schema.field(field.name).type)
+            elif pa.types.is_null(field.type):
+                field = field.with_type(pa.string())
+                self._text_columns.append(field.name)
+            fields.append(field)
+        return pa.schema(fields, metadata=inferred.metadata)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,126 @@
+"""
+Normalização em nível de palavra, com o trecho do texto original de onde
+cada palavra normalizada veio.
+
+Permite, por exemplo, manter os timestamps por palavra do Whisper depois da
+normalização: "custa R$ 25" gera "custa" (0, 5), "vinte" (6, 11), "e" (6, 11),
+"cinco" (6, 11) e "reais" (6, 11).
+"""
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple
+
+import normalizar_coluna
+from normalizar_coluna import DIGIT_PATTERN, LOADED_RULE_PLUGINS, convert_token, normalize_units, treat_specific_cases
+
+
+class NormalizedToken(NamedTuple):
+    text: str
+    start: int
+    end: int
+
+
+# Cria os tokens sem passar pelo __new__ em Python da NamedTuple, que pesa
+# quando há um token por palavra
+_new_token = tuple.__new__
+
+
+# Trechos normalizados de forma independente: cada palavra do texto original,
+# exceto quando uma regra consome o espaço entre duas palavras ("R$ 25",
+# "US$ 25", "§ 3", "25 €" e "3 ²"), que então formam um único trecho. A
+# palavra de escala de um valor monetário ("R$ 5 milhões") entra no trecho
+# do valor; sem moeda ("10 mil pessoas"), cada palavra mantém o seu trecho.
+# Cada pedaço do trecho é uma palavra ou, se a palavra tem "$", um ou mais
+# valores monetários seguidos da palavra de escala
+SPAN_PIECE = (r'(?:(?=[^\s$]*\$)(?:\S*?(?:US|R)\$\s*\d[\d.,]*\s+'
+              r'(?:mil|milhão|milhões|bilhão|bilhões|trilhão|trilhões)\b)+\S*|\S+)')
+SPAN_PATTERN = re.compile(SPAN_PIECE + r'(?:(?:(?<=[$§])\s+(?=\d)|(?<=[\d,.])\s+(?=[€²]))' + SPAN_PIECE + ')*')
+
+
+# Símbolos tratados por normalize_special_characters. Um trecho sem eles é
+# uma única palavra, que só passa pela conversão de números e pelas unidades
+SPECIAL_SYMBOL_PATTERN = re.compile(r'[&+$²§π€ºª]')
+
+
+@lru_cache(maxsize=65536)
+def normalize_word(word: str) -> str:
+    """
+    Normaliza uma palavra sem símbolos especiais, chamando diretamente as
+    etapas que se aplicam a ela, sem depender das palavras vizinhas.
+    """
+    if DIGIT_PATTERN.search(word):
+        word = convert_token(word)
+    return normalize_units(word)
+
+
+@lru_cache(maxsize=65536)
+def normalize_context_span(before: str, span: str, after: str) -> str:
+    """
+    Normaliza um trecho com símbolos especiais pelo pipeline completo,
+    cercado pelos mesmos espaços que tinha no texto original, para que as
+    regras que olham os vizinhos (como "&" entre espaços) se comportem da
+    mesma forma.
+    """
+    normalized = treat_specific_cases(before + span + after)
+    return normalized[len(before):len(normalized) - len(after)]
+
+
+def normalize_span(before: str, span: str, after: str) -> str:
+    if SPECIAL_SYMBOL_PATTERN.search(span):
+        return normalize_context_span(before, span, after)
+    return normalize_word(span)
+
+
+# Opções com que os caches acima foram preenchidos
+_CACHED_SETTINGS = None
+
+
+def clear_caches():
+    normalize_word.cache_clear()
+    normalize_context_span.cache_clear()
+
+
+def check_cache_settings():
+    """
+    Limpa os caches quando o limite de dígitos ou os plugins carregados
+    mudaram, já que o resultado de cada trecho depende deles.
+    """
+    global _CACHED_SETTINGS
+    settings = (normalizar_coluna.DIGIT_THRESHOLD, len(LOADED_RULE_PLUGINS))
+    if settings != _CACHED_SETTINGS:
+        clear_caches()
+        _CACHED_SETTINGS = settings
+
+
+def source_spans(text: str) -> List[Tuple[int, int]]:
+    return [match.span() for match in SPAN_PATTERN.finditer(text)]
+
+
+def normalize_tokens(text: str) -> List[NormalizedToken]:
+    """
+    Normaliza o texto trecho a trecho e devolve as palavras normalizadas,
+    cada uma com o início e o fim do trecho original.
+
+    O texto obtido ao juntar os trechos normalizados com os espaços originais
+    é o mesmo de treat_specific_cases. Palavras sem símbolos especiais passam
+    direto pela conversão de números e pelas unidades; só os trechos com
+    símbolos passam pelo pipeline completo. Como a maior parte das palavras
+    se repete, a normalização de cada trecho é memorizada.
+    """
+    check_cache_settings()
+    tokens = []
+    append = tokens.append
+    for match in SPAN_PATTERN.finditer(text):
+        span = match.group()
+        start, end = match.span()
+        if SPECIAL_SYMBOL_PATTERN.search(span):
+            normalized = normalize_context_span(text[start - 1:start], span, text[end:end + 1])
+        else:
+            normalized = normalize_word(span)
+            # A maior parte das palavras não muda: o trecho é a própria palavra
+            if normalized == span:
+                append(_new_token(NormalizedToken, (span, start, end)))
+                continue
+        for word in normalized.split():
+            append(_new_token(NormalizedToken, (word, start, end)))
+    return tokens